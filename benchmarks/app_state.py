@@ -0,0 +1,47 @@
+"""
+The app state the in-process webhook benchmarks run the order path on, with
+no Redis: everything the routes read from app.state is set in memory, so the
+numbers measure the order path and the fake Bybit only.
+"""
+from typing import Dict, List, Optional
+
+from ccxt.async_support.base.exchange import Exchange
+from fastapi import FastAPI
+
+from src.schemas.account import AccountGroup
+from src.services.accounts import AccountRegistry
+from src.services.idempotency import WebhookDeduplicator
+from src.services.journal import TradeJournal
+from src.services.markets import MarketCatalogue
+from src.services.positions import PositionStream
+from src.services.scheduler import KeyedScheduler
+
+
+async def wire_app(
+        app: FastAPI,
+        exs: List[Exchange],
+        groups: Optional[Dict[str, AccountGroup]] = None,
+        journal: Optional[TradeJournal] = None
+) -> FastAPI:
+    """
+    Load the markets through the first client and set app.state up for
+    /oneway and /webhook. The journal is not opened or started; without one
+    nothing is journaled.
+    """
+    await exs[0].load_markets()
+    app.state.exs = exs
+    # the catalogue is shared from the first client and never saved
+    app.state.markets = MarketCatalogue(exs, None)
+    app.state.markets.share(0)
+    # accounts and groups are set in memory and never re-read
+    app.state.accounts = AccountRegistry(None, min_accounts=len(exs))
+    app.state.accounts.exs = exs
+    app.state.accounts.groups = groups or {}
+    app.state.accounts.expires_at = float('inf')
+    # not started: every order reads its position over REST, as after a reconnect
+    app.state.positions = PositionStream(exs)
+    app.state.scheduler = KeyedScheduler()
+    # the benchmarks repeat payloads on purpose, so duplicate suppression is off
+    app.state.deduplicator = WebhookDeduplicator(None, window=0)
+    app.state.journal = journal or TradeJournal()
+    return app
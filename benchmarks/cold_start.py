@@ -0,0 +1,106 @@
+"""
+How fast a restarted worker takes alerts again: import time of the app in a
+fresh interpreter, with only Bybit loaded and with all of ccxt as before, and
+the time from spawning uvicorn to the first webhook that places an order, with
+and without a market snapshot in Redis. Needs the Redis configured through
+REDIS_HOST/REDIS_PORT; the app runs on a separate Redis database (--redis-db)
+whose keys are overwritten.
+
+    REDIS_HOST=localhost python -m benchmarks.cold_start --runs 5 --latency 0.05
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from statistics import median
+
+import httpx
+
+from benchmarks.harness import TRADINGVIEW_IP, seed, spawn, wait_until_up, webhook
+
+# the app's import must leave ccxt lazy, with everything the app and the benchmarks look up still there
+CHECK = ("import sys; import src.server; from src.utils import lazy_ccxt; "
+         "assert 'ccxt.binance' not in sys.modules, 'ccxt was imported in full'; "
+         "missing = lazy_ccxt.unresolved(); assert not missing, f'not resolved: {missing}'")
+
+IMPORTS = {
+    'bybit only': "import src.server",
+    'all of ccxt': "import ccxt, ccxt.async_support, ccxt.pro; import src.server",
+}
+
+
+def import_time(statement: str) -> float:
+    code = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    return float(subprocess.check_output([sys.executable, '-c', code], text=True))
+
+
+async def first_webhook(args, fake_url: str) -> dict:
+    """Seconds from spawning the app until it answers, takes a webhook and reports ready."""
+    timings = {}
+    start = time.perf_counter()
+    app = spawn(['-m', 'uvicorn', 'src.server:app', '--port', str(args.app_port), '--log-level', 'warning'], {
+        'BYBIT_REST_URL': fake_url,
+        'BYBIT_PRIVATE_WS_URL': fake_url.replace('http', 'ws', 1) + '/v5/private',
+        'REDIS_DB': str(args.redis_db),
+        'LOG_LEVEL': 'WARNING',
+        # opening the journal would time a database, not the app
+        'JOURNAL_ENABLED': 'false',
+    })
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.app_port}", timeout=30) as client:
+            seq = 0
+            while 'webhook' not in timings:
+                try:
+                    response = await client.post('/oneway', json=webhook(seq),
+                                                 headers={"x-forwarded-for": TRADINGVIEW_IP})
+                    timings.setdefault('serving', time.perf_counter() - start)
+                    # the router hands failures back as a 200 with an HTTPException body
+                    if response.status_code == 200 and 'status_code' not in response.text:
+                        timings['webhook'] = time.perf_counter() - start
+                except httpx.TransportError:
+                    await asyncio.sleep(0.01)
+                seq += 1
+            while (await client.get('/ready')).status_code != 200:
+                await asyncio.sleep(0.01)
+            timings['ready'] = time.perf_counter() - start
+    finally:
+        app.terminate()
+        app.wait()
+    return timings
+
+
+async def main(args):
+    subprocess.check_call([sys.executable, '-c', CHECK])
+    for label, statement in IMPORTS.items():
+        samples = [import_time(statement) for _ in range(args.runs)]
+        print(f"import, {label:<18} median {median(samples) * 1000:7.1f}ms")
+
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    fake = spawn(['-m', 'benchmarks.fake_bybit', '--port', str(args.fake_port), '--latency', str(args.latency)])
+    try:
+        async with httpx.AsyncClient() as probe:
+            await wait_until_up(probe, f"{fake_url}/v5/market/time")
+        for label, snapshot in (("no market snapshot", False), ("market snapshot", True)):
+            runs = []
+            for _ in range(args.runs):
+                if not snapshot:
+                    await seed(args.redis_db)
+                runs.append(await first_webhook(args, fake_url))
+            print(f"start, {label:<18} " + "  ".join(
+                f"{step} {median(run[step] for run in runs) * 1000:7.1f}ms" for step in ('serving', 'webhook', 'ready')
+            ))
+    finally:
+        fake.terminate()
+        fake.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--redis-db", type=int, default=15)
+    parser.add_argument("--fake-port", type=int, default=18088)
+    parser.add_argument("--app-port", type=int, default=18089)
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,81 @@
+"""
+Fire concurrent TradingView webhooks at the app while it talks to a fake Bybit.
+
+    python -m benchmarks.concurrent_webhooks --alerts 20 --latency 0.1
+
+With --journal, every webhook is also journaled to the given database, e.g.
+sqlite+aiosqlite:////tmp/journal.db, to compare against a run without it.
+"""
+import argparse
+import asyncio
+import time
+
+import ccxt.pro as ccxt
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.app_state import wire_app
+from benchmarks.fake_bybit import create_app, serve_in_thread, point_to
+from benchmarks.harness import TRADINGVIEW_IP
+from src.routers.tradingview import router as tradingview_router
+from src.services.journal import TradeJournal
+
+
+async def main(alerts: int, latency: float, port: int, journal_url: str = None):
+    url = serve_in_thread(create_app(latency), port)
+
+    app = FastAPI()
+    app.include_router(tradingview_router)
+    engine = create_async_engine(journal_url) if journal_url else None
+    # ccxt's own throttle would space the burst out; measure event-loop concurrency only
+    await wire_app(
+        app, [point_to(ccxt.bybit({'apiKey': 'key', 'secret': 'secret', 'enableRateLimit': False}), url)],
+        journal=TradeJournal(async_sessionmaker(engine) if engine else None)
+    )
+    await app.state.journal.open()
+    app.state.journal.start()
+
+    symbols = list(app.state.exs[0].markets)
+    payloads = [
+        {"side": "buy", "action": "open_position_1", "size": 0.01, "symbol": symbols[i % len(symbols)]}
+        for i in range(alerts)
+    ]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app",
+                                 headers={"x-forwarded-for": TRADINGVIEW_IP}) as client:
+        await client.post("/oneway", json=payloads[0])
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.post("/oneway", json=p) for p in payloads))
+        elapsed = time.perf_counter() - start
+
+    await app.state.exs[0].close()
+    flush_start = time.perf_counter()
+    await app.state.journal.stop()
+    flushed = time.perf_counter() - flush_start
+    if engine is not None:
+        await engine.dispose()
+
+    failed = sum(1 for r in responses if r.status_code != 200 or 'status_code' in r.json())
+    # every webhook costs at least two round-trips (fetch_position + create_order)
+    serial = alerts * 2 * latency
+    print(f"alerts={alerts} latency={latency * 1000:.0f}ms failed={failed}")
+    print(f"wall time: {elapsed:.3f}s (serialised lower bound {serial:.3f}s)")
+    # alerts for the same symbol queue behind each other, so wall time tracks the longest queue
+    stats = app.state.scheduler.stats()
+    print(f"queue: max depth {stats['maxDepth']}, wait p50 {stats['wait']['p50'] * 1000:.0f}ms "
+          f"p99 {stats['wait']['p99'] * 1000:.0f}ms")
+    if journal_url:
+        print(f"journal: final flush on shutdown {flushed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--alerts", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--journal", default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.alerts, args.latency, args.port, args.journal))
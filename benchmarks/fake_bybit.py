@@ -0,0 +1,225 @@
+"""
+Local stand-in for the Bybit v5 REST and private WebSocket API.
+
+    python -m benchmarks.fake_bybit --port 18080 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+from itertools import count
+
+import uvicorn
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+
+BASES = ("BTC", "ETH", "SOL", "XRP", "DOGE")
+# error injection only hits trading and account reads, never the market catalogue
+FAILING_PATHS = ("/v5/order/", "/v5/position/", "/v5/account/wallet-balance")
+LIMITED_PATHS = ("/v5/order/", "/v5/position/", "/v5/account/")
+
+
+def make_instruments(bases) -> list:
+    return [{
+        "symbol": f"{base}USDT",
+        "contractType": "LinearPerpetual",
+        "status": "Trading",
+        "baseCoin": base,
+        "quoteCoin": "USDT",
+        "settleCoin": "USDT",
+        "launchTime": "1585526400000",
+        "priceFilter": {"minPrice": "0.10", "maxPrice": "199999.80", "tickSize": "0.10"},
+        "lotSizeFilter": {"maxOrderQty": "1190", "minOrderQty": "0.001", "qtyStep": "0.001"},
+        "leverageFilter": {"minLeverage": "1", "maxLeverage": "100.00", "leverageStep": "0.01"},
+    } for base in bases]
+
+
+def ok(result):
+    return {"retCode": 0, "retMsg": "OK", "result": result, "retExtInfo": {}, "time": int(time.time() * 1000)}
+
+
+def wallet_row(positions: dict) -> dict:
+    # a toy margin model: every contract held locks one USDT
+    locked = round(sum(size for _, size in positions.values()), 6)
+    return {"accountType": "UNIFIED", "totalEquity": "1000", "coin": [
+        {"coin": "USDT", "equity": "1000", "walletBalance": "1000", "locked": str(locked)}
+    ]}
+
+
+def position_row(symbol: str, side: str, size: float) -> dict:
+    return {
+        "symbol": symbol, "side": side, "size": str(size), "positionIdx": 0, "category": "linear",
+        "avgPrice": "0", "leverage": "10", "markPrice": "0", "positionStatus": "Normal",
+        "tradeMode": 0, "updatedTime": str(int(time.time() * 1000)),
+    }
+
+
+def create_app(
+        latency: float = 0.0,
+        extra_instruments: int = 0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: int = 0
+) -> FastAPI:
+    instruments = make_instruments(BASES + tuple(f"COIN{idx}" for idx in range(extra_instruments)))
+    app = FastAPI()
+    app.state.positions = {}
+    app.state.sockets = set()
+    order_ids = count(1)
+    # per-endpoint fixed one-second windows, like Bybit's per-UID limits
+    windows = {}
+
+    async def publish(message: dict):
+        for socket in list(app.state.sockets):
+            try:
+                await socket.send_json(message)
+            except Exception:
+                app.state.sockets.discard(socket)
+
+    async def replay(symbol: str, order_id: str, side: str, qty: float):
+        now = int(time.time() * 1000)
+        await publish({"topic": "execution", "creationTime": now, "data": [{
+            "category": "linear", "symbol": symbol, "execId": order_id, "orderId": order_id,
+            "side": side, "execQty": str(qty), "execPrice": "0", "execTime": str(now), "execType": "Trade",
+        }]})
+        await publish({"topic": "position", "creationTime": now, "data": [
+            position_row(symbol, *app.state.positions[symbol])
+        ]})
+        await publish({"topic": "wallet", "creationTime": now, "data": [wallet_row(app.state.positions)]})
+
+    @app.middleware("http")
+    async def delay(request: Request, call_next):
+        if latency or jitter:
+            await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+        if error_rate and request.url.path.startswith(FAILING_PATHS) and random.random() < error_rate:
+            return JSONResponse({"retCode": 10016, "retMsg": "Server error (injected)", "result": {},
+                                 "retExtInfo": {}, "time": int(time.time() * 1000)})
+        path = request.url.path
+        if not rate_limit or not path.startswith(LIMITED_PATHS):
+            return await call_next(request)
+        second = int(time.time())
+        window = windows.get(path)
+        if window is None or window[0] != second:
+            window = windows[path] = [second, 0]
+        window[1] += 1
+        remaining = rate_limit - window[1]
+        headers = {"X-Bapi-Limit": str(rate_limit), "X-Bapi-Limit-Status": str(max(remaining, 0)),
+                   "X-Bapi-Limit-Reset-Timestamp": str((second + 1) * 1000)}
+        if remaining < 0:
+            return JSONResponse({"retCode": 10006, "retMsg": "Too many visits!", "result": {},
+                                 "retExtInfo": {}, "time": int(time.time() * 1000)}, headers=headers)
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
+
+    @app.get("/v5/market/time")
+    async def market_time():
+        now = time.time()
+        return ok({"timeSecond": str(int(now)), "timeNano": str(int(now * 1e9))})
+
+    @app.get("/v5/market/instruments-info")
+    async def instruments_info(category: str = "linear", status: str = None):
+        rows = [] if category != "linear" or status == "PreLaunch" else instruments
+        return ok({"category": category, "list": rows, "nextPageCursor": ""})
+
+    @app.get("/v5/asset/coin/query-info")
+    async def coin_query_info():
+        return ok({"rows": []})
+
+    @app.get("/v5/user/query-api")
+    async def query_api():
+        return ok({"id": "1", "apiKey": "fake", "readOnly": 0, "unified": 0, "uta": 1})
+
+    @app.get("/v5/account/info")
+    async def account_info():
+        return ok({"unifiedMarginStatus": 6, "marginMode": "REGULAR_MARGIN"})
+
+    @app.get("/v5/account/wallet-balance")
+    async def wallet_balance():
+        return ok({"list": [wallet_row(app.state.positions)]})
+
+    @app.get("/v5/position/list")
+    async def position_list(symbol: str = None, category: str = "linear"):
+        if symbol is not None:
+            rows = [position_row(symbol, *app.state.positions.get(symbol, ("", 0.0)))]
+        elif category == "linear":
+            rows = [position_row(s, side, size) for s, (side, size) in app.state.positions.items() if size]
+        else:
+            rows = []
+        return ok({"category": category, "list": rows, "nextPageCursor": ""})
+
+    def fill(order: dict) -> dict:
+        side, size = app.state.positions.get(order["symbol"], ("", 0.0))
+        signed = size if side == "Buy" else -size
+        qty = float(order["qty"])
+        signed += qty if order["side"] == "Buy" else -qty
+        app.state.positions[order["symbol"]] = ("Buy" if signed > 0 else "Sell" if signed < 0 else "", abs(signed))
+        order_id = str(next(order_ids))
+        asyncio.create_task(replay(order["symbol"], order_id, order["side"], qty))
+        return {"orderId": order_id, "orderLinkId": order.get("orderLinkId", "")}
+
+    @app.post("/v5/order/create")
+    async def order_create(request: Request):
+        return ok(fill(await request.json()))
+
+    @app.post("/v5/order/create-batch")
+    async def order_create_batch(request: Request):
+        body = await request.json()
+        return ok({"list": [fill(order) for order in body["request"]]})
+
+    @app.websocket("/v5/private")
+    async def private_stream(socket: WebSocket):
+        await socket.accept()
+        try:
+            while True:
+                message = await socket.receive_json()
+                op = message.get("op")
+                if op == "ping":
+                    await socket.send_json({"op": "pong", "req_id": message.get("req_id"), "args": [str(int(time.time() * 1000))]})
+                elif op in ("auth", "subscribe"):
+                    await socket.send_json({"success": True, "ret_msg": "", "op": op, "req_id": message.get("req_id"), "conn_id": "fake"})
+                    if op == "subscribe":
+                        app.state.sockets.add(socket)
+        except WebSocketDisconnect:
+            app.state.sockets.discard(socket)
+
+    return app
+
+
+def serve_in_thread(app: FastAPI, port: int, timeout: float = 30) -> str:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + timeout
+    while not server.started:
+        # uvicorn exits the thread when it cannot bind, e.g. to a port a previous run still holds
+        if not thread.is_alive():
+            raise RuntimeError(f"Fake Bybit on port {port} exited during startup")
+        if time.monotonic() >= deadline:
+            server.should_exit = True
+            raise RuntimeError(f"Fake Bybit on port {port} did not start within {timeout}s")
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+def point_to(ex, url: str):
+    for key in ('spot', 'futures', 'v2', 'public', 'private'):
+        ex.urls['api'][key] = url
+    if 'ws' in ex.urls['api']:
+        ex.urls['api']['ws']['private']['contract'] = url.replace("http", "ws", 1) + "/v5/private"
+    ex.options['fetchMarkets'] = {'types': ['linear']}
+    return ex
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--instruments", type=int, default=0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per second per private endpoint")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency, args.instruments, args.jitter, args.error_rate, args.rate_limit),
+                host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,74 @@
+"""
+Latency of reversing a position through /oneway's order path: the former
+close-then-open sequence versus the single netted order.
+
+    python -m benchmarks.flip --latency 0.05 --rounds 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import ccxt.pro as ccxt
+
+from benchmarks.fake_bybit import create_app, serve_in_thread, point_to
+from src.routers.tradingview import execute_oneway
+from src.schemas.tradingview import TradingViewRequest
+from src.services.journal import TradeJournal
+from src.services.positions import PositionStream
+from src.utils.orders import OrderSpec
+
+SYMBOL = 'BTC/USDT:USDT'
+
+
+async def close_then_open(ex, payload: TradingViewRequest, order_size: float, position_stream: PositionStream):
+    position = await position_stream.fetch_position(ex, payload.symbol)
+    await ex.create_order(payload.symbol, 'market', payload.side, position['contracts'], None,
+                          {'positionIdx': 0, 'reduceOnly': True})
+    return await ex.create_order(payload.symbol, 'market', payload.side, order_size - position['contracts'], None,
+                                 {'positionIdx': 0})
+
+
+async def netted(ex, payload: TradingViewRequest, order_size: float, position_stream: PositionStream):
+    spec = OrderSpec(ex.market(payload.symbol))
+    return await execute_oneway(ex, spec, payload, order_size, position_stream, TradeJournal(), None, 1)
+
+
+async def measure(flip, ex, position_stream: PositionStream, rounds: int):
+    samples = []
+    side = 'sell'
+    await ex.create_order(SYMBOL, 'market', 'buy', 1, None, {'positionIdx': 0})
+    for _ in range(rounds):
+        payload = TradingViewRequest(side=side, action='open_position_1', size=2, symbol=SYMBOL)
+        start = time.perf_counter()
+        await flip(ex, payload, 2.0, position_stream)
+        samples.append(time.perf_counter() - start)
+        position_stream.invalidate(ex, SYMBOL)
+        side = 'buy' if side == 'sell' else 'sell'
+    return samples
+
+
+async def main(latency: float, rounds: int, port: int):
+    fake = create_app(latency)
+    url = serve_in_thread(fake, port)
+    ex = point_to(ccxt.bybit({'apiKey': 'key', 'secret': 'secret', 'enableRateLimit': False}), url)
+    await ex.load_markets()
+    position_stream = PositionStream([ex])
+
+    for label, flip in (("close then open", close_then_open), ("single netted order", netted)):
+        fake.state.positions.clear()
+        samples = await measure(flip, ex, position_stream, rounds)
+        side, size = fake.state.positions['BTCUSDT']
+        print(f"{label:<22} median {statistics.median(samples) * 1000:7.1f}ms   "
+              f"max {max(samples) * 1000:7.1f}ms   final position {side} {size}")
+
+    await ex.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--port", type=int, default=18083)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.rounds, args.port))
@@ -0,0 +1,80 @@
+"""
+Latency of one webhook sent to a group of N accounts against a single-account
+webhook, with the fake Bybit adding a fixed latency per request. The fake is a
+single process, so at large N its own per-request overhead shows up in the numbers.
+
+    python -m benchmarks.group_fanout --accounts 1,10,50,100 --latency 0.05
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from statistics import median
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.app_state import wire_app
+from benchmarks.fake_bybit import point_to
+from benchmarks.harness import TRADINGVIEW_IP, wait_until_up
+from src.routers.tradingview import router as tradingview_router
+from src.schemas.account import AccountGroup, GroupMember
+from src.services.connections import ExchangeConnections
+from src.utils.exchange import Bybit
+
+
+async def main(sizes, latency: float, rounds: int, port: int):
+    # a separate process, so serving hundreds of requests does not compete with the app for the GIL
+    fake = subprocess.Popen([sys.executable, '-m', 'benchmarks.fake_bybit', '--port', str(port),
+                             '--latency', str(latency)])
+    url = f"http://127.0.0.1:{port}"
+    accounts = max(sizes)
+
+    app = FastAPI()
+    app.include_router(tradingview_router)
+    exs = [
+        point_to(Bybit({'apiKey': f'key{idx}', 'secret': 'secret', 'label': str(idx)}), url)
+        for idx in range(1, accounts + 1)
+    ]
+    connections = ExchangeConnections(exs)
+    connections.open()
+    async with httpx.AsyncClient() as probe:
+        await wait_until_up(probe, f"{url}/v5/market/time")
+    await wire_app(app, exs, groups={
+        str(size): AccountGroup(members=[GroupMember(account=idx) for idx in range(1, size + 1)]) for size in sizes
+    })
+
+    symbol = next(iter(exs[0].markets))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=60,
+                                 headers={"x-forwarded-for": TRADINGVIEW_IP}) as client:
+        # warm every client's credentials check and connection
+        await client.post("/oneway", json={"side": "buy", "action": "open_position", "size": 0.01,
+                                           "symbol": symbol, "group": str(accounts)})
+        for size in sizes:
+            timings, failed = [], 0
+            for idx in range(rounds):
+                payload = {"side": "buy" if idx % 2 else "sell", "action": "open_position", "size": 0.01,
+                           "symbol": symbol, "group": str(size)}
+                start = time.perf_counter()
+                body = (await client.post("/oneway", json=payload)).json()
+                timings.append(time.perf_counter() - start)
+                failed += body.get('failed', size)
+            print(f"group of {size:>4}: median {median(timings) * 1000:7.1f}ms  "
+                  f"max {max(timings) * 1000:7.1f}ms  failed orders {failed}/{size * rounds}")
+
+    await asyncio.gather(*(ex.close() for ex in exs))
+    await connections.stop()
+    fake.terminate()
+    fake.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=lambda s: [int(n) for n in s.split(',')], default=[1, 10, 50, 100])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--port", type=int, default=18080)
+    args = parser.parse_args()
+    asyncio.run(main(args.accounts, args.latency, args.rounds, args.port))
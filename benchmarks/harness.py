@@ -0,0 +1,262 @@
+"""
+End-to-end load test: boots the real app (uvicorn, Redis, both accounts) against
+the fake Bybit, fires TradingView webhooks plus account reads at stepped rates
+and finds the highest alert rate the app sustains within the latency SLO.
+Needs the Redis configured through REDIS_HOST/REDIS_PORT; the app runs on a
+separate Redis database (--redis-db) whose keys the harness overwrites.
+
+    REDIS_HOST=localhost python -m benchmarks.harness --rates 5,10,20,40 --latency 0.05
+
+Results are written to benchmarks/results/<commit>.json so runs can be diffed
+across commits.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from statistics import quantiles
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+from redis.asyncio import Redis
+
+from benchmarks.fake_bybit import BASES
+from src.config import REDIS_HOST, REDIS_PORT
+from src.services.admin_token import ADMIN_TOKEN_KEY, DEFAULT_ADMIN_TOKEN
+from src.services.markets import MARKETS_SNAPSHOT_KEY
+
+TRADINGVIEW_IP = "52.89.214.238"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def spawn(args, env=None) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, *args], env={**os.environ, **(env or {})})
+
+
+async def wait_until_up(client: httpx.AsyncClient, url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+async def seed(redis_db: int):
+    redis = Redis(host=REDIS_HOST, port=REDIS_PORT, db=redis_db, decode_responses=True)
+    # the market snapshot and admin token must come from this run, not a previous one
+    await redis.delete(MARKETS_SNAPSHOT_KEY, ADMIN_TOKEN_KEY)
+    await redis.mset({
+        'BYBIT_APIKEY_1': 'key1', 'BYBIT_SECRET_1': 'secret1',
+        'BYBIT_APIKEY_2': 'key2', 'BYBIT_SECRET_2': 'secret2',
+    })
+    await redis.aclose()
+
+
+def histogram(metrics: str, name: str, labels: dict = None) -> dict:
+    """Cumulative bucket counts, sum and count of one histogram series."""
+    labels = labels or {}
+    buckets, total, count = {}, 0.0, 0.0
+    for family in text_string_to_metric_families(metrics):
+        if family.name != name:
+            continue
+        for sample in family.samples:
+            if any(sample.labels.get(k) != v for k, v in labels.items()):
+                continue
+            if sample.name.endswith('_bucket'):
+                bound = float(sample.labels['le'])
+                buckets[bound] = buckets.get(bound, 0.0) + sample.value
+            elif sample.name.endswith('_sum'):
+                total += sample.value
+            elif sample.name.endswith('_count'):
+                count += sample.value
+    return {'buckets': buckets, 'sum': total, 'count': count}
+
+
+def histogram_delta(before: dict, after: dict) -> dict:
+    count = after['count'] - before['count']
+    buckets = {le: n - before['buckets'].get(le, 0.0) for le, n in after['buckets'].items()}
+    # upper bound of the bucket holding the 99th percentile observation
+    p99 = next((le for le, n in sorted(buckets.items()) if count and n >= 0.99 * count), 0.0)
+    return {'count': count, 'sum': after['sum'] - before['sum'], 'p99': p99}
+
+
+def percentile(samples: list, q: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return quantiles(samples, n=100, method='inclusive')[q - 1]
+
+
+def webhook(seq: int) -> dict:
+    base = BASES[seq % len(BASES)]
+    # alternate sides per symbol and account so positions stay flat over a run
+    return {
+        "side": "buy" if (seq // (2 * len(BASES))) % 2 == 0 else "sell",
+        "action": f"open_position_{seq // len(BASES) % 2 + 1}",
+        "size": 0.01,
+        "symbol": f"{base}/USDT:USDT",
+        "alert_id": uuid.uuid4().hex,
+    }
+
+
+async def timed(client: httpx.AsyncClient, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        # the routers hand failures back as a 200 with an HTTPException body
+        failed = response.status_code != 200 or 'status_code' in response.text
+    except httpx.HTTPError:
+        failed = True
+    return time.perf_counter() - start, failed
+
+
+async def step(client: httpx.AsyncClient, rate: float, duration: float, read_ratio: float) -> dict:
+    """Open-loop load: requests go out on schedule whether or not earlier ones returned."""
+    webhooks, reads = [], []
+    interval = 1 / rate
+    total = int(rate * duration)
+    start = time.perf_counter()
+    for seq in range(total):
+        delay = start + seq * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        webhooks.append(asyncio.create_task(
+            timed(client, 'POST', '/oneway', json=webhook(seq), headers={"x-forwarded-for": TRADINGVIEW_IP})
+        ))
+        if read_ratio and int((seq + 1) * read_ratio) > int(seq * read_ratio):
+            url = '/balance' if seq % 2 else f'/positions?symbol={BASES[0]}/USDT:USDT'
+            reads.append(asyncio.create_task(
+                timed(client, 'GET', url, headers={"x-api-key": DEFAULT_ADMIN_TOKEN})
+            ))
+    sent = time.perf_counter() - start
+    webhook_results = await asyncio.gather(*webhooks)
+    read_results = await asyncio.gather(*reads)
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in webhook_results]
+    read_latencies = [latency for latency, _ in read_results]
+    return {
+        'target_rate': rate,
+        # sending falls behind schedule when the harness itself is starved
+        'achieved_rate': total / (sent + interval),
+        'completed_rate': total / elapsed,
+        'webhooks': total,
+        'webhook_errors': sum(failed for _, failed in webhook_results),
+        'webhook_p50': percentile(latencies, 50),
+        'webhook_p99': percentile(latencies, 99),
+        'reads': len(read_results),
+        'read_errors': sum(failed for _, failed in read_results),
+        'read_p50': percentile(read_latencies, 50),
+        'read_p99': percentile(read_latencies, 99),
+    }
+
+
+def sustained(result: dict, slo: float) -> bool:
+    return (
+        result['webhook_p99'] <= slo
+        and result['webhook_errors'] <= 0.01 * result['webhooks']
+        and result['completed_rate'] >= 0.95 * result['target_rate']
+    )
+
+
+def commit() -> str:
+    try:
+        sha = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+        dirty = subprocess.call(['git', 'diff', '--quiet', 'HEAD'])
+        return sha + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+async def main(args):
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    await seed(args.redis_db)
+
+    fake = spawn(['-m', 'benchmarks.fake_bybit', '--port', str(args.fake_port), '--latency', str(args.latency),
+                  '--jitter', str(args.jitter), '--error-rate', str(args.error_rate)])
+    app = None
+    try:
+        async with httpx.AsyncClient(base_url=app_url, timeout=30,
+                                     limits=httpx.Limits(max_connections=None)) as client:
+            await wait_until_up(client, f"{fake_url}/v5/market/time")
+            app = spawn(['-m', 'uvicorn', 'src.server:app', '--port', str(args.app_port), '--log-level', 'warning'], {
+                'BYBIT_REST_URL': fake_url,
+                'BYBIT_PRIVATE_WS_URL': fake_url.replace('http', 'ws', 1) + '/v5/private',
+                'REDIS_DB': str(args.redis_db),
+                # every alert carries a fresh alert_id, the window only costs its Redis round-trip
+                'IDEMPOTENCY_WINDOW': str(args.idempotency_window),
+            })
+            await wait_until_up(client, '/')
+            # first calls pay for connection setup and lazy ccxt loading; keep them out of the numbers
+            await step(client, 10, 1, args.read_ratio)
+
+            steps = []
+            for rate in args.rates:
+                before = (await client.get('/metrics')).text
+                result = await step(client, rate, args.duration, args.read_ratio)
+                after = (await client.get('/metrics')).text
+                lag = histogram_delta(histogram(before, 'event_loop_lag_seconds'),
+                                      histogram(after, 'event_loop_lag_seconds'))
+                order = histogram_delta(histogram(before, 'webhook_stage_seconds', {'stage': 'total'}),
+                                        histogram(after, 'webhook_stage_seconds', {'stage': 'total'}))
+                result['event_loop_lag_total'] = lag['sum']
+                result['event_loop_lag_p99'] = lag['p99']
+                result['server_webhook_p99'] = order['p99']
+                result['sustained'] = sustained(result, args.slo)
+                steps.append(result)
+                print(f"{rate:>7.1f}/s  sent {result['achieved_rate']:>6.1f}/s  "
+                      f"p50 {result['webhook_p50'] * 1000:>7.1f}ms  p99 {result['webhook_p99'] * 1000:>7.1f}ms  "
+                      f"errors {result['webhook_errors']:>3}/{result['webhooks']:<4} "
+                      f"reads p99 {result['read_p99'] * 1000:>7.1f}ms  "
+                      f"loop blocked {result['event_loop_lag_total'] * 1000:>6.1f}ms "
+                      f"(p99 <= {result['event_loop_lag_p99'] * 1000:.1f}ms)  "
+                      f"{'ok' if result['sustained'] else 'SATURATED'}")
+                if not result['sustained'] and not args.all_rates:
+                    break
+    finally:
+        for process in (app, fake):
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    max_sustained = max((s['target_rate'] for s in steps if s['sustained']), default=0.0)
+    print(f"max sustained: {max_sustained:.1f} alerts/s (p99 <= {args.slo * 1000:.0f}ms, errors <= 1%)")
+
+    report = {
+        'commit': commit(),
+        'timestamp': int(time.time()),
+        'config': {key: getattr(args, key) for key in
+                   ('latency', 'jitter', 'error_rate', 'duration', 'read_ratio', 'slo', 'idempotency_window')},
+        'max_sustained_rate': max_sustained,
+        'steps': steps,
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"{report['commit']}.json"
+    path.write_text(json.dumps(report, indent=2))
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rates", type=lambda s: [float(r) for r in s.split(',')], default=[5, 10, 20, 40, 80])
+    parser.add_argument("--duration", type=float, default=10, help="seconds per rate step")
+    parser.add_argument("--read-ratio", type=float, default=0.5, help="account reads per webhook")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slo", type=float, default=0.5, help="webhook p99 latency budget in seconds")
+    parser.add_argument("--idempotency-window", type=int, default=30)
+    parser.add_argument("--all-rates", action="store_true", help="keep stepping after saturation")
+    parser.add_argument("--redis-db", type=int, default=15)
+    parser.add_argument("--fake-port", type=int, default=18080)
+    parser.add_argument("--app-port", type=int, default=18000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,102 @@
+"""
+/oneway against the minimal /webhook ingress: webhooks per second with a
+number of alerts in flight, and CPU time per webhook in the app process. The
+app is the real one with its middleware, called directly as an ASGI app so no
+HTTP client shares the process; the fake Bybit runs in its own process so its
+CPU time is not counted. Every webhook still places an order.
+
+    python -m benchmarks.ingress --webhooks 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.app_state import wire_app
+from benchmarks.fake_bybit import point_to
+from benchmarks.harness import TRADINGVIEW_IP, wait_until_up
+from src.server import app
+from src.utils.exchange import Bybit
+
+SYMBOLS = ["BTC/USDT:USDT", "ETH/USDT:USDT", "SOL/USDT:USDT", "XRP/USDT:USDT", "DOGE/USDT:USDT"]
+
+
+async def post(path: str, body: bytes) -> int:
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'app'), (b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode()), (b'x-forwarded-for', TRADINGVIEW_IP.encode())],
+        'client': ('127.0.0.1', 50000), 'server': ('app', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    response = {}
+
+    async def receive():
+        return messages.pop() if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            response['body'] = response.get('body', b'') + message.get('body', b'')
+
+    await app(scope, receive, send)
+    failed = response['status'] != 200 or b'status_code' in response['body'] or b'"ok":false' in response['body']
+    return 1 if failed else 0
+
+
+async def run(path: str, webhooks: int, concurrency: int):
+    bodies = [json.dumps({
+        "side": "buy" if idx % 2 else "sell", "action": "open_position_1", "size": 0.01,
+        "symbol": SYMBOLS[idx % len(SYMBOLS)]
+    }).encode() for idx in range(webhooks)]
+    pending = iter(bodies)
+    failed = 0
+
+    async def worker():
+        nonlocal failed
+        for body in pending:
+            failed += await post(path, body)
+
+    cpu, wall = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    print(f"{path:<9} {webhooks / wall:7.0f} webhooks/s  cpu {cpu / webhooks * 1e6:7.0f}µs per webhook  "
+          f"failed {failed}/{webhooks}")
+
+
+async def main(webhooks: int, concurrency: int, latency: float, port: int):
+    fake = subprocess.Popen([sys.executable, '-m', 'benchmarks.fake_bybit', '--port', str(port),
+                             '--latency', str(latency)])
+    url = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient() as probe:
+        await wait_until_up(probe, f"{url}/v5/market/time")
+
+    # ccxt's own throttle would space the load out; measure the app only
+    await wire_app(app, [
+        point_to(Bybit({'apiKey': 'key', 'secret': 'secret', 'label': '1', 'enableRateLimit': False}), url)
+    ])
+
+    # first calls pay for connection setup; keep them out of the numbers
+    await run('/oneway', concurrency, concurrency)
+    for path in ('/oneway', '/webhook', '/oneway', '/webhook'):
+        await run(path, webhooks, concurrency)
+
+    await app.state.exs[0].close()
+    fake.terminate()
+    fake.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--webhooks", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=18090)
+    args = parser.parse_args()
+    asyncio.run(main(args.webhooks, args.concurrency, args.latency, args.port))
@@ -0,0 +1,59 @@
+"""
+Time a webhook handler spends logging one received alert: the old
+print-a-reparsed-dump line against a structured record handed to the logging
+queue. Log output goes to stdout and the results to stderr, so point stdout
+somewhere slow to see the difference grow.
+
+    python -m benchmarks.logging_overhead --events 20000 > /tmp/webhooks.log
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+from src.schemas.tradingview import TradingViewRequest
+from src.utils.log import setup_logging
+
+logger = logging.getLogger('benchmarks.webhook')
+
+
+def printed(payload: TradingViewRequest):
+    print("Received payload:", json.loads(payload.model_dump_json(indent=2)))
+
+
+def logged(payload: TradingViewRequest):
+    logger.info("Webhook received", extra={
+        'alert_id': payload.alert_id,
+        'action': payload.action,
+        'side': payload.side,
+        'size': payload.size,
+        'symbol': payload.symbol,
+        'account': payload.account,
+        'group': payload.group
+    })
+
+
+def measure(log, payload: TradingViewRequest, events: int) -> float:
+    start = time.perf_counter()
+    for _ in range(events):
+        log(payload)
+    return (time.perf_counter() - start) / events
+
+
+def main(events: int):
+    payload = TradingViewRequest(side='buy', action='open_position_1', size=0.01, symbol='BTC/USDT:USDT')
+    listener = setup_logging()
+    for label, log in (("print", printed), ("queued JSON log", logged)):
+        per_event = measure(log, payload, events)
+        print(f"{label:<16} {per_event * 1e6:7.2f}us per webhook on the calling thread", file=sys.stderr)
+    drain_start = time.perf_counter()
+    listener.stop()
+    print(f"writer thread drained the rest in {time.perf_counter() - drain_start:.3f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.events)
@@ -0,0 +1,85 @@
+"""
+Per-order CPU overhead of ccxt's create_order against sending a body built
+from the precompiled order spec, with the network replaced by a canned Bybit
+response so only the client-side work is timed: market lookup, precision
+and limit checks, request building, signing and response parsing.
+
+    python -m benchmarks.order_builder --orders 20000
+"""
+import argparse
+import asyncio
+import time
+
+import ccxt.pro as ccxt
+
+from benchmarks.fake_bybit import create_app, serve_in_thread, point_to
+from src.utils.orders import OrderSpec, create_market_order
+
+SYMBOL = 'BTC/USDT:USDT'
+RESPONSE = {
+    'retCode': 0,
+    'retMsg': 'OK',
+    'result': {'orderId': '1321003749386327552', 'orderLinkId': ''},
+    'retExtInfo': {},
+    'time': 1700000000000,
+}
+
+
+async def canned(url, method='GET', headers=None, body=None):
+    return RESPONSE
+
+
+def timed(label: str, orders: int, run) -> float:
+    start = time.perf_counter()
+    run()
+    elapsed = (time.perf_counter() - start) / orders
+    print(f"{label:<34} {elapsed * 1e6:7.1f}µs per order")
+    return elapsed
+
+
+async def timed_async(label: str, orders: int, send) -> float:
+    start = time.perf_counter()
+    for idx in range(orders):
+        await send(idx)
+    elapsed = (time.perf_counter() - start) / orders
+    print(f"{label:<34} {elapsed * 1e6:7.1f}µs per order")
+    return elapsed
+
+
+async def main(orders: int, port: int):
+    url = serve_in_thread(create_app(0), port)
+    ex = point_to(ccxt.bybit({'apiKey': 'key', 'secret': 'secret', 'enableRateLimit': False}), url)
+    await ex.load_markets()
+    await ex.close()
+    ex.fetch = canned
+    amounts = [0.001 * (1 + idx % 500) for idx in range(orders)]
+
+    start = time.perf_counter()
+    for _ in range(100):
+        spec = OrderSpec(ex.market(SYMBOL))
+    print(f"{'spec build':<34} {(time.perf_counter() - start) / 100 * 1e6:7.1f}µs per market")
+
+    print("request body only")
+    ccxt_body = timed("  create_order_request", orders, lambda: [
+        ex.create_order_request(SYMBOL, 'market', 'buy', amount, None, {'positionIdx': 0}) for amount in amounts
+    ])
+    spec_body = timed("  OrderSpec.market_order", orders, lambda: [
+        spec.market_order('buy', amount) for amount in amounts
+    ])
+
+    print("full order, canned response")
+    ccxt_order = await timed_async("  create_order", orders, lambda idx: ex.create_order(
+        SYMBOL, 'market', 'buy', amounts[idx], None, {'positionIdx': 0}
+    ))
+    spec_order = await timed_async("  create_market_order", orders, lambda idx: create_market_order(
+        ex, spec, 'buy', amounts[idx]
+    ))
+    print(f"speed-up: body {ccxt_body / spec_body:.1f}x, full order {ccxt_order / spec_order:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--port", type=int, default=18087)
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.port))
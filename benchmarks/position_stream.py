@@ -0,0 +1,56 @@
+"""
+Replay position updates from the fake Bybit WebSocket and compare cached reads with REST.
+
+    python -m benchmarks.position_stream --latency 0.05
+"""
+import argparse
+import asyncio
+import time
+
+import ccxt.pro as ccxt
+
+from benchmarks.fake_bybit import create_app, serve_in_thread, point_to
+from src.services.positions import PositionStream
+
+SYMBOL = 'BTC/USDT:USDT'
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - start
+
+
+async def main(latency: float, port: int):
+    url = serve_in_thread(create_app(latency), port)
+    ex = point_to(ccxt.bybit({'apiKey': 'key', 'secret': 'secret', 'enableRateLimit': False}), url)
+    await ex.load_markets()
+
+    stream = PositionStream([ex])
+    stream.start()
+    while ex not in stream.live:
+        await asyncio.sleep(0.01)
+
+    _, rest = await timed(stream.fetch_position(ex, SYMBOL))
+    _, cached = await timed(stream.fetch_position(ex, SYMBOL))
+    print(f"first read (REST fallback): {rest * 1000:.2f}ms")
+    print(f"second read (stream cache): {cached * 1000:.3f}ms")
+
+    await ex.create_order(SYMBOL, 'market', 'buy', 0.5, None, {'positionIdx': 0})
+    stream.invalidate(ex, SYMBOL)
+    while stream.cached(ex, SYMBOL) is None:
+        await asyncio.sleep(0.001)
+    position, cached = await timed(stream.fetch_position(ex, SYMBOL))
+    print(f"after fill, replayed position: side={position['side']} contracts={position['contracts']} "
+          f"read in {cached * 1000:.3f}ms")
+
+    await stream.stop()
+    await ex.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=18081)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.port))
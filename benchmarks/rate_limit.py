@@ -0,0 +1,83 @@
+"""
+Orders under a dashboard read flood: a plain ccxt client (one sleeping throttle
+shared by everything) against the Bybit client with per-endpoint token buckets
+and an order lane. The fake Bybit enforces a per-endpoint limit and answers
+over-limit calls with retCode 10006.
+
+    python -m benchmarks.rate_limit --readers 20 --orders 10 --rate-limit 10
+"""
+import argparse
+import asyncio
+import time
+from statistics import median
+
+import ccxt.pro as ccxt
+
+from benchmarks.fake_bybit import create_app, serve_in_thread, point_to
+from src.utils.exchange import Bybit
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+async def flood(ex, counts: dict, stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            await ex.fetch_balance()
+            counts['served'] += 1
+        except ccxt.RateLimitExceeded:
+            counts['limited'] += 1
+            await asyncio.sleep(0.05)
+        except Exception:
+            counts['failed'] += 1
+            await asyncio.sleep(0.05)
+
+
+async def run(label: str, ex, readers: int, orders: int, interval: float):
+    await ex.load_markets()
+    counts = {'served': 0, 'limited': 0, 'failed': 0}
+    stop = asyncio.Event()
+    flooders = [asyncio.create_task(flood(ex, counts, stop)) for _ in range(readers)]
+    await asyncio.sleep(1)
+
+    latencies, rejected = [], 0
+    start = time.perf_counter()
+    for idx in range(orders):
+        begin = time.perf_counter()
+        try:
+            await ex.create_order(SYMBOL, 'market', 'buy' if idx % 2 else 'sell', 0.01, None, {'positionIdx': 0})
+            latencies.append(time.perf_counter() - begin)
+        except ccxt.RateLimitExceeded:
+            rejected += 1
+        await asyncio.sleep(interval)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await asyncio.gather(*flooders)
+    await ex.close()
+    reads = ', '.join(f"{key} {value / elapsed:.1f}/s" for key, value in counts.items())
+    if latencies:
+        order = f"order median {median(latencies) * 1000:6.1f}ms max {max(latencies) * 1000:6.1f}ms"
+    else:
+        order = "no order went through"
+    print(f"{label:<18}{order}  rejected {rejected}/{orders}  reads: {reads}")
+
+
+async def main(readers: int, orders: int, interval: float, latency: float, rate_limit: int, port: int):
+    url = serve_in_thread(create_app(latency, rate_limit=rate_limit), port)
+    config = {'apiKey': 'key', 'secret': 'secret'}
+    await run("ccxt throttle", point_to(ccxt.bybit(config), url), readers, orders, interval)
+    # let the fake's one-second windows roll over
+    await asyncio.sleep(1)
+    await run("order lane", point_to(Bybit({**config, 'label': 'bench'}), url), readers, orders, interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=20)
+    parser.add_argument("--orders", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--rate-limit", type=int, default=10)
+    parser.add_argument("--port", type=int, default=18080)
+    args = parser.parse_args()
+    asyncio.run(main(args.readers, args.orders, args.interval, args.latency, args.rate_limit, args.port))
@@ -0,0 +1,87 @@
+"""
+Dashboard pollers hammering /balance: how many wallet-balance requests reach
+Bybit and how long each poll takes, with the read cache reduced to request
+coalescing only, with a TTL, and with a TTL plus stale-while-revalidate.
+
+    python -m benchmarks.read_cache --pollers 50 --seconds 5 --latency 0.1
+"""
+import argparse
+import asyncio
+import time
+from statistics import median, quantiles
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.fake_bybit import create_app, serve_in_thread, point_to
+from src.dependencies.credentials import get_api_key
+from src.routers.account import router as account_router
+from src.services.reads import ReadCache
+from src.utils.exchange import Bybit
+from src.utils.metrics import EXCHANGE_REQUEST_SECONDS
+
+BALANCE_PATH = '/v5/account/wallet-balance'
+
+
+def upstream_requests(ex: Bybit) -> float:
+    for metric in EXCHANGE_REQUEST_SECONDS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith('_count') and sample.labels == {'account': ex.label, 'endpoint': BALANCE_PATH}:
+                return sample.value
+    return 0.0
+
+
+async def poll(client: httpx.AsyncClient, timings: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/balance")
+        timings.append(time.perf_counter() - start)
+
+
+async def run(label: str, app: FastAPI, reads: ReadCache, pollers: int, seconds: float):
+    ex = app.state.exs[0]
+    app.state.reads = reads
+    before = upstream_requests(ex)
+    timings, stop = [], asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=30) as client:
+        tasks = [asyncio.create_task(poll(client, timings, stop)) for _ in range(pollers)]
+        await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+    # let a background refresh finish before the next run
+    await asyncio.gather(*reads.requests.inflight.values(), return_exceptions=True)
+    upstream = upstream_requests(ex) - before
+    print(f"{label:<22} polls {len(timings) / seconds:7.0f}/s  upstream {upstream / seconds:5.1f}/s  "
+          f"p50 {median(timings) * 1000:6.1f}ms  p99 {quantiles(timings, n=100)[98] * 1000:6.1f}ms")
+
+
+async def main(pollers: int, seconds: float, latency: float, ttl: float, stale: float, port: int):
+    url = serve_in_thread(create_app(latency), port)
+    app = FastAPI()
+    app.include_router(account_router)
+    app.dependency_overrides[get_api_key] = lambda: 'benchmark'
+    app.state.exs = [point_to(Bybit({'apiKey': 'key', 'secret': 'secret', 'label': '1'}), url)]
+    await app.state.exs[0].load_markets()
+    await app.state.exs[0].fetch_balance()
+
+    for label, reads in (
+            ("coalescing only", ReadCache(ttl=0, stale=0)),
+            (f"ttl {ttl * 1000:.0f}ms", ReadCache(ttl=ttl, stale=0)),
+            (f"ttl + {stale:.1f}s stale", ReadCache(ttl=ttl, stale=stale)),
+    ):
+        await run(label, app, reads, pollers, seconds)
+
+    await app.state.exs[0].close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pollers", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--ttl", type=float, default=0.5)
+    parser.add_argument("--stale", type=float, default=2)
+    parser.add_argument("--port", type=int, default=18084)
+    args = parser.parse_args()
+    asyncio.run(main(args.pollers, args.seconds, args.latency, args.ttl, args.stale, args.port))
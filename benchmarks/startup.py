@@ -0,0 +1,65 @@
+"""
+Compare startup market loading: one load_markets() per client (the old path),
+a cold MarketCatalogue download and a warm start from the Redis snapshot.
+Needs the Redis configured through REDIS_HOST/REDIS_PORT; the snapshot is
+written to and deleted from a separate Redis database (--redis-db).
+
+    REDIS_HOST=localhost python -m benchmarks.startup --accounts 2 --latency 0.2 --instruments 500
+"""
+import argparse
+import asyncio
+import time
+
+import ccxt.pro as ccxt
+from redis.asyncio import Redis
+
+from benchmarks.fake_bybit import create_app, serve_in_thread, point_to
+from src.config import REDIS_HOST, REDIS_PORT
+from src.services.markets import MarketCatalogue, MARKETS_SNAPSHOT_KEY
+
+
+def clients(url: str, accounts: int):
+    return [point_to(ccxt.bybit({'enableRateLimit': False}), url) for _ in range(accounts)]
+
+
+async def timed(label: str, exs, coro):
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    for ex in exs:
+        await ex.close()
+    print(f"{label:<32}{elapsed * 1000:>10.1f}ms")
+
+
+async def sequential(exs):
+    for ex in exs:
+        await ex.load_markets()
+
+
+async def main(accounts: int, latency: float, instruments: int, port: int, redis_db: int):
+    url = serve_in_thread(create_app(latency, instruments), port)
+    redis = Redis(host=REDIS_HOST, port=REDIS_PORT, db=redis_db, decode_responses=True)
+    await redis.delete(MARKETS_SNAPSHOT_KEY)
+
+    exs = clients(url, accounts)
+    await timed("load_markets per client", exs, sequential(exs))
+
+    exs = clients(url, accounts)
+    await timed("cold start (download)", exs, MarketCatalogue(exs, redis).load())
+
+    exs = clients(url, accounts)
+    await timed("warm start (snapshot)", exs, MarketCatalogue(exs, redis).load())
+
+    await redis.delete(MARKETS_SNAPSHOT_KEY)
+    await redis.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--instruments", type=int, default=500)
+    parser.add_argument("--port", type=int, default=18082)
+    parser.add_argument("--redis-db", type=int, default=15)
+    args = parser.parse_args()
+    asyncio.run(main(args.accounts, args.latency, args.instruments, args.port, args.redis_db))
@@ -0,0 +1,133 @@
+"""
+Many dashboards on /stream while orders fill: time from sending an order to
+each client receiving the position update, and the Bybit REST requests the
+clients cost beyond the orders themselves. The fake Bybit runs in its own
+process and the app under a real uvicorn server, since streaming needs one.
+
+    python -m benchmarks.stream_fanout --clients 10,100,500 --orders 20
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from statistics import median, quantiles
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from benchmarks.fake_bybit import point_to
+from benchmarks.harness import wait_until_up
+from src.dependencies.credentials import get_api_key
+from src.routers.account import router as account_router
+from src.services.feed import AccountFeed
+from src.services.positions import PositionStream
+from src.services.reads import ReadCache
+from src.utils.exchange import Bybit
+from src.utils.metrics import EXCHANGE_REQUEST_SECONDS
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+def rest_requests() -> float:
+    return sum(
+        sample.value for metric in EXCHANGE_REQUEST_SECONDS.collect() for sample in metric.samples
+        if sample.name.endswith('_count')
+    )
+
+
+async def listen(client: httpx.AsyncClient, url: str, connected: asyncio.Event, arrivals: list):
+    async with client.stream("GET", url) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("event: snapshot"):
+                connected.set()
+            elif line.startswith("data: ") and '"position"' in line and '"symbol"' in line:
+                position = json.loads(line[len("data: "):])
+                if 'position' in position:
+                    arrivals.append((time.perf_counter(), position['position']['contracts']))
+
+
+async def run(ex: Bybit, app_url: str, clients: int, orders: int):
+    limits = httpx.Limits(max_connections=clients + 10)
+    async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+        connected = [asyncio.Event() for _ in range(clients)]
+        arrivals = [[] for _ in range(clients)]
+        url = f"{app_url}/stream?account=1&symbol={SYMBOL}"
+        listeners = [
+            asyncio.create_task(listen(client, url, connected[idx], arrivals[idx])) for idx in range(clients)
+        ]
+        await asyncio.gather(*(event.wait() for event in connected))
+        await asyncio.sleep(0.5)
+        for samples in arrivals:
+            samples.clear()
+
+        before = rest_requests()
+        sent = []
+        for idx in range(orders):
+            sent.append(time.perf_counter())
+            await ex.create_order(SYMBOL, 'market', 'buy' if idx % 2 else 'sell', 0.01, None, {'positionIdx': 0})
+            await asyncio.sleep(0.2)
+        extra = rest_requests() - before - orders
+
+        for task in listeners:
+            task.cancel()
+        await asyncio.gather(*listeners, return_exceptions=True)
+
+    delays = [
+        arrived - max(at for at in sent if at <= arrived)
+        for samples in arrivals for arrived, _ in samples if arrived >= sent[0]
+    ]
+    received = sum(len(samples) for samples in arrivals)
+    print(f"clients {clients:>4}: updates {received:>6}/{clients * orders}  "
+          f"p50 {median(delays) * 1000:6.1f}ms  p99 {quantiles(delays, n=100)[98] * 1000:6.1f}ms  "
+          f"extra REST requests {extra:.0f}")
+
+
+async def main(sizes, orders: int, latency: float, port: int, app_port: int):
+    fake = subprocess.Popen([sys.executable, '-m', 'benchmarks.fake_bybit', '--port', str(port),
+                             '--latency', str(latency)])
+    url = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient() as probe:
+        await wait_until_up(probe, f"{url}/v5/market/time")
+
+    app = FastAPI()
+    app.include_router(account_router)
+    app.dependency_overrides[get_api_key] = lambda: 'benchmark'
+    ex = point_to(Bybit({'apiKey': 'key', 'secret': 'secret', 'label': '1'}), url)
+    await ex.load_markets()
+    app.state.exs = [ex]
+    app.state.positions = PositionStream(app.state.exs)
+    app.state.positions.start()
+    app.state.reads = ReadCache()
+    app.state.positions.on_invalidate(app.state.reads.invalidate)
+    app.state.feed = AccountFeed(app.state.exs, app.state.positions, app.state.reads)
+    app.state.feed.start()
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=app_port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    for clients in sizes:
+        await run(ex, f"http://127.0.0.1:{app_port}", clients, orders)
+
+    server.should_exit = True
+    await serving
+    await app.state.feed.stop()
+    await app.state.positions.stop()
+    await ex.close()
+    fake.terminate()
+    fake.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=lambda s: [int(n) for n in s.split(',')], default=[10, 100, 500])
+    parser.add_argument("--orders", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--port", type=int, default=18085)
+    parser.add_argument("--app-port", type=int, default=18086)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.orders, args.latency, args.port, args.app_port))
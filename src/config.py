@@ -0,0 +1,72 @@
+import os
+
+# point the Bybit clients somewhere other than api.bybit.com, e.g. a local stand-in
+BYBIT_REST_URL = os.getenv("BYBIT_REST_URL")
+BYBIT_PRIVATE_WS_URL = os.getenv("BYBIT_PRIVATE_WS_URL")
+
+# shared keep-alive pool for the Bybit REST clients; pings must come more often than the keep-alive timeout
+BYBIT_POOL_SIZE = int(os.getenv("BYBIT_POOL_SIZE", "100"))
+BYBIT_KEEPALIVE_TIMEOUT = float(os.getenv("BYBIT_KEEPALIVE_TIMEOUT", "60"))
+BYBIT_WARM_CONNECTIONS = int(os.getenv("BYBIT_WARM_CONNECTIONS", "4"))
+BYBIT_PING_INTERVAL = float(os.getenv("BYBIT_PING_INTERVAL", "15"))
+
+# accounts to create clients for even without stored credentials; stored BYBIT_APIKEY_<n> keys add more
+BYBIT_ACCOUNTS = int(os.getenv("BYBIT_ACCOUNTS", "2"))
+ACCOUNT_GROUPS_TTL = float(os.getenv("ACCOUNT_GROUPS_TTL", "5"))
+# how often each worker re-checks its credentials against Redis and reports them for /accountSync
+CREDENTIALS_SYNC_INTERVAL = float(os.getenv("CREDENTIALS_SYNC_INTERVAL", "30"))
+
+ACCOUNT_TIMEOUT = float(os.getenv("ACCOUNT_TIMEOUT", "5"))
+# how many accounts a single fan-out talks to at once
+FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", "32"))
+
+# /balance and /positions results are fresh for READ_CACHE_TTL seconds,
+# then served for READ_CACHE_STALE more while a refresh runs
+READ_CACHE_TTL = float(os.getenv("READ_CACHE_TTL", "0.5"))
+READ_CACHE_STALE = float(os.getenv("READ_CACHE_STALE", "2"))
+READ_CACHE_SIZE = int(os.getenv("READ_CACHE_SIZE", "4096"))
+# seconds between keep-alive comments on an idle /stream connection
+STREAM_HEARTBEAT = float(os.getenv("STREAM_HEARTBEAT", "15"))
+
+# share of each endpoint's budget reads may not touch, and how long a read may queue before it is shed
+RATE_LIMIT_READ_RESERVE = float(os.getenv("RATE_LIMIT_READ_RESERVE", "0.2"))
+RATE_LIMIT_MAX_READ_WAIT = float(os.getenv("RATE_LIMIT_MAX_READ_WAIT", "1"))
+
+REDIS_HOST = os.getenv("REDIS_HOST", "redis")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_POOL_SIZE = int(os.getenv("REDIS_POOL_SIZE", "50"))
+REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+
+ADMIN_TOKEN_TTL = float(os.getenv("ADMIN_TOKEN_TTL", "30"))
+
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+# bcrypt releases the GIL, so these threads hash in parallel with the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+MARKETS_SNAPSHOT_TTL = int(os.getenv("MARKETS_SNAPSHOT_TTL", "86400"))
+MARKETS_REFRESH_INTERVAL = float(os.getenv("MARKETS_REFRESH_INTERVAL", "3600"))
+
+# write-behind trade journal: rows beyond JOURNAL_QUEUE_SIZE are dropped rather than slowing webhooks
+JOURNAL_ENABLED = os.getenv("JOURNAL_ENABLED", "true").lower() == "true"
+JOURNAL_QUEUE_SIZE = int(os.getenv("JOURNAL_QUEUE_SIZE", "10000"))
+JOURNAL_BATCH_SIZE = int(os.getenv("JOURNAL_BATCH_SIZE", "500"))
+JOURNAL_FLUSH_INTERVAL = float(os.getenv("JOURNAL_FLUSH_INTERVAL", "1"))
+
+IDEMPOTENCY_WINDOW = int(os.getenv("IDEMPOTENCY_WINDOW", "30"))
+# how long an alert being executed stays claimed without a refresh; refreshed every third of it
+IDEMPOTENCY_LEASE = int(os.getenv("IDEMPOTENCY_LEASE", "60"))
+# how long a repeated delivery waits for the first one to finish before answering 409
+IDEMPOTENCY_MAX_WAIT = float(os.getenv("IDEMPOTENCY_MAX_WAIT", "30"))
+# jobs for one account and symbol hold a Redis lock across workers: its lease, refreshed every third of it,
+# and how long a job waits for it before running without it
+ORDER_LOCK_LEASE = float(os.getenv("ORDER_LOCK_LEASE", "60"))
+ORDER_LOCK_WAIT = float(os.getenv("ORDER_LOCK_WAIT", "30"))
+
+# JSON log lines go through a bounded queue to a writer thread; lines beyond LOG_QUEUE_SIZE are dropped
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# share of successful GETs logged per path, for endpoints dashboards poll
+LOG_SAMPLE_RATES = os.getenv(
+    "LOG_SAMPLE_RATES", "/balance=0.1,/positions=0.1,/rateLimits=0.1,/executionQueue=0.1,/metrics=0"
+)
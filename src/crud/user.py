@@ -1,23 +1,24 @@
 from typing import Type
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ulid import ULID
 
 from src.database import models
-from src.utils.credentials import hash_password
+from src.utils.credentials import hash_password_async
 from src.utils.handler import handle_error, handle_none_value
 
 
 @handle_none_value("User")
 @handle_error
-def get_user_by_id(db: Session, user_id: str) -> Type[models.User] | models.User | None:
-    user = db.query(models.User).filter_by(id=user_id).first()
-    return user
+async def get_user_by_id(db: AsyncSession, user_id: str) -> Type[models.User] | models.User | None:
+    result = await db.execute(select(models.User).filter_by(id=user_id))
+    return result.scalars().first()
 
 
 @handle_error
-def create_user(
-        db: Session,
+async def create_user(
+        db: AsyncSession,
         name: str,
         username: str,
         password: str,
@@ -28,18 +29,18 @@ def create_user(
         name=name
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     account = models.UserAccount(
         id=str(ULID()),
         username=username,
-        password=hash_password(password),
+        password=await hash_password_async(password),
         user_id=user.id
     )
     db.add(account)
-    db.commit()
-    db.refresh(account)
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(account)
+    await db.refresh(user, ['account'])
 
     return user
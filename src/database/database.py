@@ -1,82 +1,107 @@
+import logging
 import os
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 
 DB_HOST = os.getenv("DB_HOST", "mysql")
 DB_USER = os.getenv("DB_USER", "admin")
 DB_PASS = os.getenv("DB_PASS", "admin1234")
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = os.getenv("DB_NAME", "template_db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# overrides the MySQL settings above, e.g. sqlite+aiosqlite:///./test.db
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+logger = logging.getLogger(__name__)
 
 
 def get_database_url(user, password, host, port, db_name=None):
-    base_url = f"mysql+pymysql://{user}:{password}@{host}:{port}"
+    base_url = f"mysql+asyncmy://{user}:{password}@{host}:{port}"
     return f"{base_url}/{db_name}?charset=utf8mb4" if db_name else base_url
 
 
-def drop_database(url, db_name):
+def build_engine(url) -> AsyncEngine:
+    if url.startswith("sqlite"):
+        return create_async_engine(url)
+    return create_async_engine(
+        url,
+        pool_pre_ping=True,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW
+    )
+
+
+async def drop_database(url, db_name):
+    _engine = create_async_engine(url)
     try:
-        with create_engine(url).connect() as connection:
-            connection.execute(text(f"DROP DATABASE IF EXISTS {db_name}"))
+        async with _engine.connect() as connection:
+            await connection.execute(text(f"DROP DATABASE IF EXISTS {db_name}"))
     except OperationalError as e:
-        print(f"Error dropping database: {e}")
+        logger.error("Error dropping database: %s", e)
+    finally:
+        await _engine.dispose()
 
 
 # Function to create database if it does not exist
-def create_database_if_not_exists(url, db_name):
+async def create_database_if_not_exists(url, db_name):
+    _engine = create_async_engine(url)
     try:
-        with create_engine(url).connect() as connection:
-            connection.execute(text(f"CREATE DATABASE IF NOT EXISTS {db_name}"))
+        async with _engine.connect() as connection:
+            await connection.execute(text(f"CREATE DATABASE IF NOT EXISTS {db_name}"))
     except OperationalError as e:
-        print(f"Error creating database: {e}")
+        logger.error("Error creating database: %s", e)
+    finally:
+        await _engine.dispose()
 
 
-def drop_all_tables(_engine=None):
+async def drop_all_tables(_engine: AsyncEngine = None):
     try:
-        Base.metadata.drop_all(bind=_engine)
-        print("All tables dropped successfully.")
+        async with (_engine or engine).begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        logger.info("All tables dropped successfully.")
     except OperationalError as e:
-        print(f"Error dropping tables: {e}")
+        logger.error("Error dropping tables: %s", e)
 
 
 # Function to create all tables
-def create_all_tables(_engine=None):
+async def create_all_tables(_engine: AsyncEngine = None):
     try:
-        Base.metadata.create_all(bind=_engine)
-        print("All tables created successfully.")
+        async with (_engine or engine).begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        logger.info("All tables created successfully.")
     except OperationalError as e:
-        print(f"Error creating tables: {e}")
+        logger.error("Error creating tables: %s", e)
+
+
+async def init_database():
+    """Create the database and its tables if missing. Call once at startup, never at import."""
+    # registers the tables on Base; the models module imports this one
+    from src.database import models  # noqa: F401
+    if DATABASE_URL is None:
+        await create_database_if_not_exists(TRIAL_URL, DB_NAME)
+    await create_all_tables(engine)
 
 
 # Construct URLs
 TRIAL_URL = get_database_url(DB_USER, DB_PASS, DB_HOST, DB_PORT)
-SQLALCHEMY_DATABASE_URL = get_database_url(DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME)
-
-# Create the database if it doesn't exist
-create_database_if_not_exists(TRIAL_URL, DB_NAME)
+SQLALCHEMY_DATABASE_URL = DATABASE_URL or get_database_url(DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME)
 
-# Create engine with connection pooling options
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=1800,
-    pool_size=20,  # Adjust pool size as needed
-    max_overflow=10  # Adjust as needed
-)
+# Creating the engine opens no connection; the pool fills on first use
+engine = build_engine(SQLALCHEMY_DATABASE_URL)
 
 # Create a configured "Session" class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
 # Create a base class for declarative models
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -33,3 +33,29 @@ class UserAccount(Base):
 
     user_id = Column(String(36), ForeignKey("users.id"))
     user = lazy_relationship("User", back_populates="account")
+
+
+class WebhookLog(Base):
+    __tablename__ = "webhooks"
+
+    id = Column(String(36), primary_key=True, index=True, unique=True)
+    received_at = Column(DateTime, index=True)
+
+    alert_id = Column(String(64), index=True)
+    action = Column(String(32))
+    symbol = Column(String(64), index=True)
+    payload = Column(JSON)
+
+
+class TradeEvent(Base):
+    __tablename__ = "trade_events"
+
+    id = Column(String(36), primary_key=True, index=True, unique=True)
+    created_at = Column(DateTime, index=True)
+
+    # no foreign key: a webhook row dropped under backpressure must not fail its events' batch
+    webhook_id = Column(String(36), index=True)
+    kind = Column(String(16), index=True)
+    account = Column(Integer)
+    symbol = Column(String(64))
+    data = Column(JSON)
@@ -1,9 +1,20 @@
 from typing import List
 
-from ccxt import Exchange
-from redis import StrictRedis as Redis
+from ccxt.async_support import Exchange
 from starlette.requests import Request
 
+from src.services.accounts import AccountRegistry
+from src.services.admin_token import AdminTokenCache
+from src.services.feed import AccountFeed
+from src.services.idempotency import WebhookDeduplicator
+from src.services.journal import TradeJournal
+from src.services.positions import PositionStream
+from src.services.reads import ReadCache
+from src.services.readiness import Readiness
+from src.services.scheduler import KeyedScheduler
+from src.services.symbols import SymbolIndex
+from src.utils.orders import OrderSpecs
+
 
 def get_ip(request: Request):
     forwarded_for = request.headers.get("x-forwarded-for")
@@ -18,6 +29,45 @@ def get_exchanges(request: Request) -> List[Exchange]:
     return request.app.state.exs
 
 
-def get_redis_client():
-    r = Redis(host='redis', port=6379, decode_responses=True)
-    return r
+def get_accounts(request: Request) -> AccountRegistry:
+    return request.app.state.accounts
+
+
+def get_symbol_index(request: Request) -> SymbolIndex:
+    return request.app.state.markets.symbols
+
+
+def get_order_specs(request: Request) -> OrderSpecs:
+    return request.app.state.markets.specs
+
+
+def get_positions(request: Request) -> PositionStream:
+    return request.app.state.positions
+
+
+def get_reads(request: Request) -> ReadCache:
+    return request.app.state.reads
+
+
+def get_feed(request: Request) -> AccountFeed:
+    return request.app.state.feed
+
+
+def get_readiness(request: Request) -> Readiness:
+    return request.app.state.readiness
+
+
+def get_admin_token(request: Request) -> AdminTokenCache:
+    return request.app.state.admin_token
+
+
+def get_scheduler(request: Request) -> KeyedScheduler:
+    return request.app.state.scheduler
+
+
+def get_deduplicator(request: Request) -> WebhookDeduplicator:
+    return request.app.state.deduplicator
+
+
+def get_journal(request: Request) -> TradeJournal:
+    return request.app.state.journal
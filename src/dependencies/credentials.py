@@ -1,18 +1,17 @@
-from fastapi import Security, HTTPException, status
+from fastapi import Depends, Security, HTTPException, status
 from fastapi.security import APIKeyHeader
 
-from src.dependencies.basic import get_redis_client
+from src.dependencies.basic import get_admin_token
+from src.services.admin_token import AdminTokenCache
 
 api_key_header = APIKeyHeader(name='x-api-key', auto_error=False)
 
 
-def get_api_key(api_key: str = Security(api_key_header)) -> str:
-    redis_client = get_redis_client()
-    admin_token = redis_client.get('ADMIN_TOKEN')
-    redis_client.close()
-
-    if admin_token is None:
-        admin_token = 'zxcvbnm1234'
+async def get_api_key(
+        api_key: str = Security(api_key_header),
+        admin_token_cache: AdminTokenCache = Depends(get_admin_token)
+) -> str:
+    admin_token = await admin_token_cache.get()
 
     if api_key != admin_token:
         raise HTTPException(
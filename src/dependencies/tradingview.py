@@ -1,11 +1,20 @@
+import time
+
 from fastapi import HTTPException, Depends, status
+from starlette.requests import Request
 
 from src.dependencies.basic import get_ip
+from src.utils.metrics import stage
+
+# addresses TradingView sends webhooks from
+TRADINGVIEW_IPS = frozenset({"52.89.214.238", "34.212.75.30", "54.218.53.128", "52.32.178.7"})
 
 
-def request_from_tradingview(ip: str = Depends(get_ip)):
-    if ip not in ["52.89.214.238", "34.212.75.30", "54.218.53.128", "52.32.178.7"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"Invalid IP: {ip}"
-        )
+def request_from_tradingview(request: Request, ip: str = Depends(get_ip)):
+    with stage('ip_check'):
+        if ip not in TRADINGVIEW_IPS:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Invalid IP: {ip}"
+            )
+    request.state.ip_checked_at = time.perf_counter()
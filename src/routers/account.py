@@ -1,10 +1,17 @@
-from typing import Annotated
+import asyncio
+import json
+from typing import Annotated, List
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
-from src.dependencies.basic import get_exchanges, get_redis_client
+from src.config import STREAM_HEARTBEAT
+from src.dependencies.basic import get_accounts, get_exchanges, get_feed, get_positions, get_reads, get_scheduler
 from src.dependencies.credentials import get_api_key
+from src.schemas.account import AccountGroup
 from src.schemas.basic import Credentials
+from src.utils.fanout import fan_out
+from src.utils.ratelimit import rate_limit_stats
 
 router = APIRouter(
     tags=['Exchange Account'],
@@ -14,31 +21,72 @@ router = APIRouter(
 
 @router.get('/balance')
 async def balance(
-        exs=Depends(get_exchanges)
+        exs=Depends(get_exchanges),
+        reads=Depends(get_reads)
 ):
-    try:
-        return {idx: ex.fetch_balance() for idx, ex in enumerate(exs, 1)}
-    except Exception as e:
-        return HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    return await fan_out(exs, lambda ex: reads.get(ex, 'balance', None, ex.fetch_balance))
 
 
 @router.get('/positions')
 async def positions(
         symbol: Annotated[
             str, Query(..., title="Symbol to get positions for", description="Symbol to get positions for")],
-        exs=Depends(get_exchanges)
+        exs=Depends(get_exchanges),
+        position_stream=Depends(get_positions),
+        reads=Depends(get_reads)
 ):
+    return await fan_out(exs, lambda ex: reads.get(
+        ex, 'position', symbol, lambda: position_stream.fetch_position(ex, symbol)
+    ))
+
+
+@router.get('/stream')
+async def stream(
+        account: Annotated[
+            List[int], Query(title="Accounts to stream", description="Accounts to stream, all if omitted")
+        ] = [],
+        symbol: Annotated[
+            List[str], Query(title="Symbols to stream positions for", description="Symbols to stream positions for")
+        ] = [],
+        feed=Depends(get_feed)
+):
+    """
+    Server-Sent Events: a `snapshot` of balances and positions per account,
+    then `position` and `balance` events as they change. A client that reads
+    slowly gets only the latest value per symbol and currency.
+    """
     try:
-        return {idx: ex.fetch_position(symbol) for idx, ex in enumerate(exs, 1)}
-    except Exception as e:
-        return HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        feed.check(account)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
 
+    async def events():
+        subscription = None
+        try:
+            # only once the response is being sent: a client gone before that leaves nothing behind
+            subscription = feed.subscribe(account, symbol)
+            snapshot = await feed.snapshot(subscription)
+            yield f"event: snapshot\ndata: {json.dumps(snapshot, default=str)}\n\n"
+            while True:
+                try:
+                    batch = await asyncio.wait_for(subscription.next(), STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # keeps proxies from closing an idle connection
+                    yield ": ping\n\n"
+                    continue
+                yield ''.join(f"event: {event}\ndata: {data}\n\n" for event, data in batch)
+        finally:
+            if subscription is not None:
+                feed.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 
 @router.post('/leverage')
 async def set_leverage(
@@ -46,15 +94,14 @@ async def set_leverage(
             str, Query(..., title="Symbol to set leverage for", description="Symbol to set leverage for")],
         leverage: Annotated[
             int, Query(..., title="Leverage to set", description="Leverage to set", ge=1, le=100)],
-        exs=Depends(get_exchanges)
+        exs=Depends(get_exchanges),
+        reads=Depends(get_reads)
 ):
     try:
-        return {idx: ex.set_leverage(leverage, symbol) for idx, ex in enumerate(exs, 1) if ex.apiKey is not None}
-    except Exception as e:
-        return HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+        return await fan_out(exs, lambda ex: ex.set_leverage(leverage, symbol), only_with_credentials=True)
+    finally:
+        for ex in exs:
+            reads.invalidate(ex)
 
 
 @router.post('/setup')
@@ -62,18 +109,64 @@ async def setup_account(
         symbol: Annotated[
             str, Query(..., title="Symbol to setup account for", description="Symbol to setup account for")
         ],
+        exs=Depends(get_exchanges),
+        reads=Depends(get_reads)
+):
+    try:
+        return await fan_out(exs, lambda ex: ex.set_position_mode(False, symbol))
+    finally:
+        for ex in exs:
+            reads.invalidate(ex)
+
+
+@router.get('/executionQueue')
+async def execution_queue(
+        scheduler=Depends(get_scheduler)
+):
+    return scheduler.stats()
+
+
+@router.get('/rateLimits')
+async def rate_limits(
         exs=Depends(get_exchanges)
 ):
-    data = {}
-    for idx, ex in enumerate(exs, 1):
-        try:
-            response = ex.set_position_mode(False, symbol)
-        except Exception as e:
-            response = str(e)
+    return rate_limit_stats(exs)
+
+
+@router.get('/accountGroups')
+async def get_account_groups(
+        accounts=Depends(get_accounts)
+):
+    return await accounts.get_groups()
+
+
+@router.put('/accountGroups/{name}')
+async def set_account_group(
+        name: str,
+        group: AccountGroup,
+        accounts=Depends(get_accounts)
+):
+    try:
+        await accounts.set_group(name, group)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return {name: group}
 
-        data[idx] = response
 
-    return data
+@router.delete('/accountGroups/{name}')
+async def delete_account_group(
+        name: str,
+        accounts=Depends(get_accounts)
+):
+    if not await accounts.delete_group(name):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Account group {name} not found"
+        )
+    return {"deleted": name}
 
 
 @router.get('/apiKey')
@@ -87,30 +180,29 @@ async def get_api_key(
 async def set_api_key(
         credentials: Credentials,
         _idx: Annotated[
-            int, Query(..., title="Exchange index", description="Exchange index", ge=1, le=2)
+            int, Query(..., title="Exchange index", description="Exchange index", ge=1)
         ] = 1,
-        exs=Depends(get_exchanges)
+        exs=Depends(get_exchanges),
+        accounts=Depends(get_accounts)
 ):
-    idx = _idx - 1
-
-    redis_client = get_redis_client()
-
-    old_apiKey = exs[idx].apiKey
-    old_secret = exs[idx].secret
+    if _idx > len(exs):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Exchange {_idx} not found, there are {len(exs)}"
+        )
 
-    result = None
+    # every worker, here and on other nodes, switches over once the keys are verified and stored
     try:
-        exs[idx].apiKey = credentials.apiKey
-        exs[idx].secret = credentials.secretKey
-        result = exs[idx].fetch_balance()
-        redis_client.set(f'BYBIT_APIKEY_{_idx}', credentials.apiKey)
-        redis_client.set(f'BYBIT_SECRET_{_idx}', credentials.secretKey)
+        return await accounts.set_credentials(_idx, credentials.apiKey, credentials.secretKey)
     except Exception as e:
-        exs[idx].apiKey = old_apiKey
-        exs[idx].secret = old_secret
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
-    return result
+
+@router.get('/accountSync')
+async def account_sync(
+        accounts=Depends(get_accounts)
+):
+    return await accounts.consistency()
@@ -1,14 +1,27 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import JSONResponse
 
-from src.dependencies.basic import get_ip, get_exchanges
+from src.dependencies.basic import get_ip, get_readiness, get_symbol_index
+from src.services.readiness import Readiness
 
 router = APIRouter(
     tags=['Basic']
 )
 
 
+@router.get('/health')
+async def liveness():
+    return {"status": "ok"}
+
+
+@router.get('/ready')
+async def readiness(readiness: Annotated[Readiness, Depends(get_readiness)]):
+    body = readiness.status()
+    return JSONResponse(body, status_code=status.HTTP_200_OK if body['ready'] else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
 @router.get('/ip')
 async def get_client_ip(ip: str = Depends(get_ip)):
     return {"ip": ip}
@@ -19,9 +32,14 @@ async def get_symbols_by_keyword(
         keyword: Annotated[
             str, Query(..., title="Keyword to search for", description="Keyword to search for")
         ],
-        exs=Depends(get_exchanges)
+        limit: Annotated[
+            Optional[int], Query(title="Result limit", description="Maximum number of symbols to return", ge=1)
+        ] = None,
+        rank: Annotated[
+            bool, Query(
+                title="Rank results", description="Return symbols starting with the keyword before the other matches"
+            )
+        ] = False,
+        symbol_index=Depends(get_symbol_index)
 ):
-    all_symbols = list(exs[0].markets.keys())
-    filter_symbols = [symbol for symbol in all_symbols if keyword.lower() in symbol.lower()]
-    return [symbol for symbol in filter_symbols if
-            exs[0].markets[symbol]['active'] and exs[0].markets[symbol]['contract']]
+    return symbol_index.search(keyword, limit, rank)
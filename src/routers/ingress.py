@@ -0,0 +1,99 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter, ValidationError
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match, Route
+from starlette.types import Scope
+
+from src.dependencies.basic import get_ip
+from src.dependencies.tradingview import TRADINGVIEW_IPS
+from src.routers.tradingview import dispatch
+from src.schemas.tradingview import TradingViewRequest
+from src.utils.metrics import observe_stage, stage
+
+# built once: validates straight from the request bytes, without an intermediate dict
+TRADINGVIEW_REQUEST = TypeAdapter(TradingViewRequest)
+
+
+def json_response(content: Any, status_code: int = status.HTTP_200_OK) -> Response:
+    return Response(
+        orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS),
+        status_code=status_code,
+        media_type='application/json'
+    )
+
+
+def _order_ids(result: Any) -> List[Optional[str]]:
+    return [order.get('id') for order in (result if isinstance(result, list) else [result])]
+
+
+def summarize(result: Any) -> Tuple[int, Dict[str, Any]]:
+    """
+    Status code and slim body for a dispatch result: order ids instead of
+    whole ccxt orders, real status codes instead of a 200 wrapping an error.
+    """
+    if isinstance(result, HTTPException):
+        return result.status_code, {'ok': False, 'error': result.detail}
+    if isinstance(result, dict) and 'accounts' in result:
+        return status.HTTP_200_OK, {
+            'ok': result['failed'] == 0,
+            'group': result['group'],
+            'succeeded': result['succeeded'],
+            'failed': result['failed'],
+            'accounts': {
+                account: {'orders': _order_ids(outcome['result'])} if 'result' in outcome else
+                {'error': outcome['error']}
+                for account, outcome in result['accounts'].items()
+            }
+        }
+    return status.HTTP_200_OK, {'ok': True, 'orders': _order_ids(result)}
+
+
+async def tradingview_webhook(request: Request) -> Response:
+    """
+    POST /webhook: the same alert handling as /oneway without FastAPI's
+    dependency resolution and response encoding. The sender's address is
+    checked before the body is read, and the response only carries order ids:
+    {"ok": true, "orders": [...]}, or {"ok": false, "error": ...} with a
+    4xx/5xx status; a group alert reports each account the same way.
+    """
+    received_at = getattr(request.state, 'received_at', time.perf_counter())
+    with stage('ip_check'):
+        ip = get_ip(request)
+        if ip not in TRADINGVIEW_IPS:
+            return json_response({'ok': False, 'error': f"Invalid IP: {ip}"}, status.HTTP_403_FORBIDDEN)
+
+    with stage('payload_validation'):
+        try:
+            payload = TRADINGVIEW_REQUEST.validate_json(await request.body())
+        except ValidationError as e:
+            return json_response(
+                {'ok': False, 'error': e.errors(include_url=False, include_context=False)},
+                status.HTTP_400_BAD_REQUEST
+            )
+
+    state = request.app.state
+    try:
+        result = await dispatch(payload, state.exs, state.accounts, state.positions, state.scheduler,
+                                state.deduplicator, state.journal, state.markets.specs)
+        status_code, body = summarize(result)
+        return json_response(body, status_code)
+    finally:
+        observe_stage('total', received_at)
+
+
+class IngressRoute(Route):
+    """A plain Starlette route that, like FastAPI's, leaves itself in the scope for the request metrics."""
+
+    def matches(self, scope: Scope) -> Tuple[Match, Scope]:
+        match, child_scope = super().matches(scope)
+        if match != Match.NONE:
+            child_scope['route'] = self
+        return match, child_scope
+
+
+webhook_route = IngressRoute('/webhook', tradingview_webhook, methods=['POST'], include_in_schema=False)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 
-from src.dependencies.basic import get_redis_client
+from src.dependencies.basic import get_admin_token
 from src.dependencies.credentials import get_api_key
 from src.schemas.basic import TextOnly
 
@@ -12,9 +12,8 @@ router = APIRouter(
 
 @router.post('/adminToken')
 async def set_admin_token(
-        token: TextOnly
+        token: TextOnly,
+        admin_token_cache=Depends(get_admin_token)
 ):
-    redis_client = get_redis_client()
-    redis_client.set('ADMIN_TOKEN', token.text)
-    redis_client.close()
+    await admin_token_cache.set(token.text)
     return {"adminToken": token.text}
@@ -1,12 +1,27 @@
-import json
-from typing import List, Annotated
+import logging
+import time
+from typing import Annotated, Dict, List, Optional
 
-from ccxt import bybit
+from ccxt.async_support import bybit
 from fastapi import APIRouter, Depends, HTTPException, status
+from starlette.requests import Request
 
-from src.dependencies.basic import get_exchanges
+from src.dependencies.basic import (
+    get_accounts, get_deduplicator, get_exchanges, get_journal, get_order_specs, get_positions, get_scheduler
+)
 from src.dependencies.tradingview import request_from_tradingview
 from src.schemas.tradingview import TradingViewRequest
+from src.services.accounts import AccountRegistry
+from src.services.idempotency import WebhookDeduplicator
+from src.services.journal import TradeJournal
+from src.services.positions import PositionStream
+from src.services.scheduler import KeyedScheduler
+from src.utils.fanout import run_bounded
+from src.utils.metrics import observe_stage, stage
+from src.utils.orders import OrderSpec, OrderSpecs, create_market_order, create_market_orders
+from src.utils.ratelimit import high_priority
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     tags=['TradingView'],
@@ -14,33 +29,32 @@ router = APIRouter(
 )
 
 
-@router.post('/oneway')
-async def oneway_action(
+async def execute_oneway(
+        ex: bybit,
+        spec: OrderSpec,
         payload: TradingViewRequest,
-        exs: Annotated[List[bybit], Depends(get_exchanges)]
+        order_size: float,
+        position_stream: PositionStream,
+        journal: TradeJournal,
+        webhook_id: Optional[str],
+        account: int
 ):
-    print("Received payload:", json.loads(payload.model_dump_json(indent=2)))
-
-    if payload.symbol not in exs[0].markets:
-        return HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Symbol {payload.symbol} not found"
-        )
-
-    order_size = payload.size / exs[0].markets[payload.symbol]['contractSize']
-    account_idx = payload.action.split('_')[-1]
-    account_idx = int(account_idx) - 1
-
-    current_position = exs[account_idx].fetch_position(payload.symbol)
+    # the read in front of an order must not queue behind dashboard reads
+    with stage('fetch_position'), high_priority():
+        current_position = await position_stream.fetch_position(ex, payload.symbol)
     p_side = current_position['side'] if current_position else None
     p_size = current_position['contracts'] if current_position else 0
 
-    params = {'positionIdx': 0}
+    def record(kind: str, data):
+        journal.event(webhook_id, kind, account, payload.symbol, data)
+
+    reduce_only = False
+    order_stage = 'close_order' if 'close_position' in payload.action else 'open_order'
 
     try:
 
         if 'close_position' in payload.action:
-            params['reduceOnly'] = True
+            reduce_only = True
             if p_size > 0:
                 if payload.side == 'buy':
                     assert p_side == 'short', f"Wrong side to close position: {p_side} >> {payload.side}"
@@ -53,30 +67,144 @@ async def oneway_action(
             if p_size > 0:
                 if (payload.side == 'buy' and p_side == 'short') or \
                         (payload.side == 'sell' and p_side == 'long'):
-                    # close position first
-                    _params = {'positionIdx': 0, 'reduceOnly': True}
-                    exs[account_idx].create_order(
-                        symbol=payload.symbol,
-                        type='market',
-                        side='buy' if p_side == 'short' else 'sell',
-                        amount=p_size,
-                        price=None,
-                        params=_params
-                    )
-
-                    order_size -= p_size
-
-        return exs[account_idx].create_order(
-            symbol=payload.symbol,
-            type='market',
-            side=payload.side,
-            amount=order_size,
-            price=None,
-            params=params
-        )
+                    # in one-way mode a single order nets against the open position,
+                    # so the close and the open leg go out as one order of order_size
+                    order_stage = 'flip_order'
+                    max_qty = spec.max_market_qty
+                    if max_qty is not None and max_qty < order_size and p_size < order_size:
+                        # too large for one market order: send both legs in one batch
+                        record('decision', {'position': p_side, 'contracts': p_size, 'stage': 'batch_order',
+                                            'amount': order_size, 'reduceOnly': reduce_only})
+                        with stage('batch_order'):
+                            result = await create_market_orders(ex, spec, [
+                                {'side': payload.side, 'contracts': p_size, 'reduce_only': True},
+                                {'side': payload.side, 'contracts': order_size - p_size},
+                            ])
+                        record('order', result)
+                        return result
+
+        record('decision', {'position': p_side, 'contracts': p_size, 'stage': order_stage,
+                            'amount': order_size, 'reduceOnly': reduce_only})
+        with stage(order_stage):
+            result = await create_market_order(ex, spec, payload.side, order_size, reduce_only)
+        record('order', result)
+        return result
 
     except Exception as e:
+        record('error', {'error': str(e)})
+        logger.warning("Order failed: %s", e, extra={'account': account, 'symbol': payload.symbol})
         return HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+    finally:
+        position_stream.invalidate(ex, payload.symbol)
+
+
+async def execute_group(
+        targets: Dict[int, float],
+        payload: TradingViewRequest,
+        spec: OrderSpec,
+        exs: List[bybit],
+        position_stream: PositionStream,
+        scheduler: KeyedScheduler,
+        journal: TradeJournal,
+        webhook_id: Optional[str]
+):
+    # no timeout: an order cancelled mid-flight may still have been placed
+    results = await run_bounded({
+        idx: (lambda idx=idx, size=size: scheduler.run(
+            (idx, payload.symbol),
+            lambda: execute_oneway(
+                exs[idx - 1], spec, payload, spec.contracts(size), position_stream, journal, webhook_id, idx
+            )
+        )) for idx, size in targets.items()
+    }, timeout=None)
+    for result in results.values():
+        if isinstance(result.get('result'), HTTPException):
+            result['error'] = result.pop('result').detail
+    return {
+        'group': payload.group,
+        'succeeded': sum('result' in result for result in results.values()),
+        'failed': sum('error' in result for result in results.values()),
+        'accounts': results
+    }
+
+
+async def dispatch(
+        payload: TradingViewRequest,
+        exs: List[bybit],
+        accounts: AccountRegistry,
+        position_stream: PositionStream,
+        scheduler: KeyedScheduler,
+        deduplicator: WebhookDeduplicator,
+        journal: TradeJournal,
+        specs: OrderSpecs
+):
+    """Journal a validated alert and execute it; rejections come back as an HTTPException."""
+    logger.info("Webhook received", extra={
+        'alert_id': payload.alert_id,
+        'action': payload.action,
+        'side': payload.side,
+        'size': payload.size,
+        'symbol': payload.symbol,
+        'account': payload.account,
+        'group': payload.group
+    })
+    webhook_id = journal.webhook(payload)
+
+    with stage('market_lookup'):
+        spec = specs.get(payload.symbol)
+        if spec is None:
+            journal.event(webhook_id, 'rejected', symbol=payload.symbol, data={'error': 'symbol not found'})
+            logger.warning("Webhook rejected: symbol %s not found", payload.symbol)
+            return HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Symbol {payload.symbol} not found"
+            )
+
+    # may read the account registry from Redis, so timed apart from the in-memory market lookup
+    with stage('account_lookup'):
+        try:
+            targets = await accounts.targets(payload)
+        except ValueError as e:
+            journal.event(webhook_id, 'rejected', symbol=payload.symbol, data={'error': str(e)})
+            logger.warning("Webhook rejected: %s", e)
+            return HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+    if payload.group is not None:
+        return await deduplicator.run(payload, lambda: execute_group(
+            targets, payload, spec, exs, position_stream, scheduler, journal, webhook_id
+        ))
+
+    (account, size), = targets.items()
+    # alerts for the same account and symbol must see each other's fills
+    return await deduplicator.run(payload, lambda: scheduler.run(
+        (account, payload.symbol),
+        lambda: execute_oneway(
+            exs[account - 1], spec, payload, spec.contracts(size), position_stream, journal, webhook_id, account
+        )
+    ))
+
+
+@router.post('/oneway')
+async def oneway_action(
+        request: Request,
+        payload: TradingViewRequest,
+        exs: Annotated[List[bybit], Depends(get_exchanges)],
+        accounts: Annotated[AccountRegistry, Depends(get_accounts)],
+        position_stream: Annotated[PositionStream, Depends(get_positions)],
+        scheduler: Annotated[KeyedScheduler, Depends(get_scheduler)],
+        deduplicator: Annotated[WebhookDeduplicator, Depends(get_deduplicator)],
+        journal: Annotated[TradeJournal, Depends(get_journal)],
+        specs: Annotated[OrderSpecs, Depends(get_order_specs)]
+):
+    entered_at = time.perf_counter()
+    observe_stage('payload_validation', getattr(request.state, 'ip_checked_at', entered_at))
+    try:
+        return await dispatch(payload, exs, accounts, position_stream, scheduler, deduplicator, journal, specs)
+    finally:
+        observe_stage('total', getattr(request.state, 'received_at', entered_at))
@@ -0,0 +1,13 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class GroupMember(BaseModel):
+    account: int = Field(..., title="Account index", ge=1)
+    multiplier: float = Field(1.0, title="Multiplier applied to the alert size", gt=0)
+    maxSize: Optional[float] = Field(None, title="Cap on the order size for this account", gt=0)
+
+
+class AccountGroup(BaseModel):
+    members: List[GroupMember] = Field(..., title="Accounts in the group", min_length=1)
@@ -1,5 +1,5 @@
 from enum import Enum, EnumMeta
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -19,6 +19,9 @@ class CustomStringEnum(str, Enum, metaclass=MetaEnum):
 
 
 class ActionEnum(CustomStringEnum):
+    # without a number the alert must name an `account` or a `group`
+    OPEN_POSITION = "open_position"
+    CLOSE_POSITION = "close_position"
     OPEN_POSITION_1 = "open_position_1"
     CLOSE_POSITION_1 = "close_position_1"
     OPEN_POSITION_2 = "open_position_2"
@@ -30,3 +33,6 @@ class TradingViewRequest(BaseModel):
     action: ActionEnum = Field(..., title="Action to take")
     size: float = Field(..., title="Size of the trade")
     symbol: str = Field(..., title="Symbol to trade")
+    account: Optional[int] = Field(None, title="Account index to trade, overrides the number in the action", ge=1)
+    group: Optional[str] = Field(None, title="Account group to trade, each member sized by its own rule")
+    alert_id: Optional[str] = Field(None, title="Unique alert id, used to drop repeated deliveries")
@@ -1,41 +1,124 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-import ccxt
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from redis.asyncio import BlockingConnectionPool, Redis
 from starlette.requests import Request
 
-from src.dependencies.basic import get_redis_client
+# before the app imports ccxt: load only the exchanges that are used
+from src.utils import lazy_ccxt
+
+lazy_ccxt.install()
+
+from src.config import REDIS_HOST, REDIS_PORT, REDIS_POOL_SIZE, REDIS_DB, JOURNAL_ENABLED
+from src.database.database import SessionLocal, engine, init_database
 from src.routers.account import router as account_router
 from src.routers.basic import router as basic_router
+from src.routers.ingress import webhook_route
 from src.routers.settings import router as settings_router
 from src.routers.tradingview import router as tradingview_router
 from src.schemas.basic import TextOnly
+from src.services.accounts import AccountRegistry
+from src.services.admin_token import AdminTokenCache
+from src.services.connections import ExchangeConnections
+from src.services.feed import AccountFeed
+from src.services.idempotency import WebhookDeduplicator
+from src.services.journal import TradeJournal
+from src.services.markets import MarketCatalogue
+from src.services.positions import PositionStream
+from src.services.reads import ReadCache
+from src.services.readiness import Readiness
+from src.services.scheduler import KeyedScheduler
+from src.utils.log import RequestLogMiddleware, setup_logging
+from src.utils.metrics import MetricsMiddleware, monitor_event_loop
 
 load_dotenv()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    redis_client = get_redis_client()
-
-    app.state.exs = [ccxt.bybit({
-        'apiKey': redis_client.get('BYBIT_APIKEY_1'),
-        'secret': redis_client.get('BYBIT_SECRET_1')
-    }), ccxt.bybit({
-        'apiKey': redis_client.get('BYBIT_APIKEY_2'),
-        'secret': redis_client.get('BYBIT_SECRET_2')
-    })]
-
-    redis_client.close()
-
-    # Load the ML model
-    for ex in app.state.exs:
-        ex.load_markets()
+    log_listener = setup_logging()
+    lazy_ccxt.check()
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+
+    app.state.redis = Redis.from_pool(BlockingConnectionPool(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        db=REDIS_DB,
+        max_connections=REDIS_POOL_SIZE,
+        decode_responses=True
+    ))
+    app.state.admin_token = AdminTokenCache(app.state.redis)
+    app.state.admin_token.start()
+
+    app.state.accounts = AccountRegistry(app.state.redis)
+    app.state.exs = await app.state.accounts.load()
+
+    app.state.connections = ExchangeConnections(app.state.exs)
+    app.state.connections.open()
+    app.state.markets = MarketCatalogue(app.state.exs, app.state.redis)
+    app.state.journal = TradeJournal(SessionLocal if JOURNAL_ENABLED else None)
+
+    async def open_database():
+        # the journal's tables go into the database init_database creates
+        await init_database()
+        await app.state.journal.open()
+
+    # orders cannot be built without the markets; the connections warm up while the app already serves
+    await asyncio.gather(app.state.markets.load(), open_database())
+    app.state.markets.start()
+    app.state.journal.start()
+
+    app.state.positions = PositionStream(app.state.exs)
+    app.state.positions.start()
+
+    app.state.readiness = Readiness(app.state.exs, app.state.markets, app.state.connections, app.state.positions)
+    app.state.readiness.run('warm connections', app.state.connections.warm())
+    app.state.connections.start()
+
+    # orders and fills make an account's cached balance and positions unusable
+    app.state.reads = ReadCache()
+    app.state.positions.on_invalidate(app.state.reads.invalidate)
+
+    app.state.feed = AccountFeed(app.state.exs, app.state.positions, app.state.reads)
+    app.state.feed.start()
+
+    async def credentials_changed(ex):
+        app.state.reads.invalidate(ex)
+        await app.state.positions.restart(ex)
+
+    # credential changes made through any worker re-authenticate this worker's streams too
+    app.state.accounts.on_change(credentials_changed)
+    app.state.accounts.start()
+
+    app.state.scheduler = KeyedScheduler(app.state.redis)
+    # another worker's last order for the account and symbol may not have reached this worker's streams yet
+    app.state.scheduler.on_handover(
+        lambda key: app.state.positions.invalidate(app.state.exs[key[0] - 1], key[1])
+    )
+    app.state.deduplicator = WebhookDeduplicator(app.state.redis)
     yield
 
+    await app.state.readiness.stop()
+    await app.state.accounts.stop()
+    await app.state.feed.stop()
+    await app.state.positions.stop()
+    await app.state.markets.stop()
+    await app.state.admin_token.stop()
+    # after the exchange clients close no more events arrive; write out the rest
+    await asyncio.gather(*(ex.close() for ex in app.state.exs))
+    await app.state.journal.stop()
+    await app.state.connections.stop()
+    await app.state.redis.aclose()
+    await engine.dispose()
+    loop_monitor.cancel()
+    # writes out whatever is still queued
+    log_listener.stop()
+
 
 app = FastAPI(
     title="Template FastAPI Backend Server",
@@ -55,11 +138,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+# outermost, so the correlation id is set before anything else runs
+app.add_middleware(RequestLogMiddleware)
 
 app.include_router(settings_router)
 app.include_router(basic_router)
 app.include_router(account_router)
 app.include_router(tradingview_router)
+# outside FastAPI's dependency resolution and response encoding
+app.router.routes.append(webhook_route)
 
 
 @app.get("/", response_model=TextOnly)
@@ -67,6 +155,11 @@ async def root():
     return TextOnly(text="Hello World")
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/elements", include_in_schema=False)
 async def api_documentation(request: Request):
     return HTMLResponse("""
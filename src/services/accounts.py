@@ -0,0 +1,295 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from redis.asyncio import Redis
+
+from src.config import BYBIT_ACCOUNTS, ACCOUNT_GROUPS_TTL, CREDENTIALS_SYNC_INTERVAL
+from src.schemas.account import AccountGroup
+from src.schemas.tradingview import TradingViewRequest
+from src.utils.exchange import Bybit
+from src.utils.ratelimit import RateLimiter
+
+APIKEY_KEY = 'BYBIT_APIKEY_{}'
+SECRET_KEY = 'BYBIT_SECRET_{}'
+ACCOUNT_GROUPS_KEY = 'BYBIT_ACCOUNT_GROUPS'
+ACCOUNTS_CHANNEL = 'BYBIT_ACCOUNTS_CHANGED'
+# worker id -> the credential fingerprints that worker trades with, for the consistency check
+WORKERS_KEY = 'BYBIT_ACCOUNT_WORKERS'
+RESUBSCRIBE_DELAY = 1
+# per-account state ccxt caches after the first private call
+ACCOUNT_OPTIONS = ('enableUnifiedMargin', 'enableUnifiedAccount', 'unifiedMarginStatus')
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(api_key: Optional[str], secret: Optional[str]) -> Optional[str]:
+    """Short digest that tells credentials apart without revealing them."""
+    if api_key is None:
+        return None
+    return hashlib.sha256(f"{api_key}:{secret}".encode()).hexdigest()[:12]
+
+
+class AccountRegistry:
+    """
+    The Bybit accounts this server trades, numbered from 1, and the named
+    groups a webhook can target.
+
+    Credentials live in Redis under BYBIT_APIKEY_<n> / BYBIT_SECRET_<n>; a
+    client is built for every stored index and for at least `min_accounts`.
+    Groups live in the ACCOUNT_GROUPS_KEY hash and are re-read at most every
+    `ttl` seconds.
+
+    Redis is the source of truth for every worker on every node. A change
+    made through one worker is published on ACCOUNTS_CHANNEL, and every
+    worker then re-reads the credentials and swaps them into its client in
+    place. Every `sync_interval` seconds, and after each resubscribe, a worker
+    reconciles all accounts with Redis and reports the fingerprints it trades
+    with under WORKERS_KEY, so `consistency()` can compare every live worker.
+    """
+
+    def __init__(
+            self,
+            redis: Redis,
+            min_accounts: int = BYBIT_ACCOUNTS,
+            ttl: float = ACCOUNT_GROUPS_TTL,
+            sync_interval: float = CREDENTIALS_SYNC_INTERVAL
+    ):
+        self.redis = redis
+        self.min_accounts = min_accounts
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self.exs: List[Bybit] = []
+        self.groups: Dict[str, AccountGroup] = {}
+        self.expires_at = 0.0
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        # awaited with the client after its credentials change, e.g. to re-authenticate streams
+        self.listeners: List[Callable[[Bybit], Awaitable[Any]]] = []
+        self.tasks: List[asyncio.Task] = []
+
+    async def load(self) -> List[Bybit]:
+        stored = [
+            int(idx) async for key in self.redis.scan_iter(match=APIKEY_KEY.format('*'))
+            if (idx := key[len(APIKEY_KEY.format('')):]).isdigit()
+        ]
+        count = max([self.min_accounts, *stored])
+        keys = [key.format(idx) for idx in range(1, count + 1) for key in (APIKEY_KEY, SECRET_KEY)]
+        values = await self.redis.mget(*keys)
+        self.exs = [Bybit({
+            'apiKey': values[2 * idx],
+            'secret': values[2 * idx + 1],
+            'label': str(idx + 1)
+        }) for idx in range(count)]
+        await self.get_groups()
+        return self.exs
+
+    async def get_groups(self) -> Dict[str, AccountGroup]:
+        if time.monotonic() >= self.expires_at:
+            raw = await self.redis.hgetall(ACCOUNT_GROUPS_KEY)
+            self.groups = {name: AccountGroup.model_validate_json(value) for name, value in raw.items()}
+            self.expires_at = time.monotonic() + self.ttl
+        return self.groups
+
+    async def set_group(self, name: str, group: AccountGroup):
+        unknown = [member.account for member in group.members if member.account > len(self.exs)]
+        if unknown:
+            raise ValueError(f"Unknown accounts {unknown}, there are {len(self.exs)}")
+        await self.redis.hset(ACCOUNT_GROUPS_KEY, name, group.model_dump_json())
+        self.groups[name] = group
+        await self._publish({'groups': True})
+
+    async def delete_group(self, name: str) -> bool:
+        self.groups.pop(name, None)
+        deleted = bool(await self.redis.hdel(ACCOUNT_GROUPS_KEY, name))
+        await self._publish({'groups': True})
+        return deleted
+
+    def on_change(self, listener: Callable[[Bybit], Awaitable[Any]]):
+        self.listeners.append(listener)
+
+    async def set_credentials(self, account: int, api_key: str, secret: str) -> dict:
+        """
+        Check the credentials with a balance request from a throwaway client,
+        then store them, switch this worker over and tell the others. The live
+        client never signs a request with unverified credentials.
+        Returns the balance.
+        """
+        ex = self.exs[account - 1]
+        probe = Bybit({'apiKey': api_key, 'secret': secret, 'label': ex.label})
+        probe.urls = copy.deepcopy(ex.urls)
+        if ex.session is not None:
+            # the shared pool: already warm, and not closed with the probe
+            probe.session, probe.own_session, probe.ssl_context = ex.session, False, ex.ssl_context
+        probe.options['timeDifference'] = ex.options.get('timeDifference', 0)
+        probe.set_markets_from_exchange(ex)
+        try:
+            balance = await probe.fetch_balance()
+        finally:
+            await probe.close()
+
+        await self.redis.mset({APIKEY_KEY.format(account): api_key, SECRET_KEY.format(account): secret})
+        await self._apply(account, api_key, secret)
+        await self._publish({'account': account})
+        await self.report()
+        return balance
+
+    async def _apply(self, account: int, api_key: Optional[str], secret: Optional[str]):
+        ex = self.exs[account - 1]
+        if (ex.apiKey, ex.secret) == (api_key, secret):
+            return
+        # one synchronous step: no request is ever signed with a mix of old and new
+        ex.apiKey, ex.secret = api_key, secret
+        for option in ACCOUNT_OPTIONS:
+            ex.options.pop(option, None)
+        # a new key may belong to another UID with its own limits
+        ex.limiter = RateLimiter(ex.label)
+        logger.info("Credentials for account %d changed", account, extra={
+            'account': account, 'fingerprint': fingerprint(api_key, secret)
+        })
+        for listener in self.listeners:
+            await listener(ex)
+
+    async def sync(self, accounts: Optional[List[int]] = None):
+        """Bring the given accounts, or all of them, in line with Redis."""
+        accounts = accounts or list(range(1, len(self.exs) + 1))
+        if not accounts:
+            return
+        values = await self.redis.mget(
+            *(key.format(account) for account in accounts for key in (APIKEY_KEY, SECRET_KEY))
+        )
+        for idx, account in enumerate(accounts):
+            await self._apply(account, values[2 * idx], values[2 * idx + 1])
+
+    def fingerprints(self) -> Dict[int, Optional[str]]:
+        return {account: fingerprint(ex.apiKey, ex.secret) for account, ex in enumerate(self.exs, 1)}
+
+    async def report(self):
+        await self.redis.hset(WORKERS_KEY, self.worker, json.dumps({
+            'fingerprints': self.fingerprints(),
+            'reportedAt': time.time()
+        }))
+
+    async def consistency(self) -> dict:
+        """
+        Compare the credentials every live worker reports against Redis.
+        Workers silent for three sync intervals are dropped from the report.
+        """
+        await self.report()
+        count = len(self.exs)
+        values = await self.redis.mget(
+            *(key.format(account) for account in range(1, count + 1) for key in (APIKEY_KEY, SECRET_KEY))
+        )
+        expected = {
+            str(account): fingerprint(values[2 * idx], values[2 * idx + 1])
+            for idx, account in enumerate(range(1, count + 1))
+        }
+
+        workers, stale = {}, []
+        for worker, raw in (await self.redis.hgetall(WORKERS_KEY)).items():
+            reported = json.loads(raw)
+            if time.time() - reported['reportedAt'] > 3 * self.sync_interval:
+                stale.append(worker)
+                continue
+            mismatched = sorted(
+                int(account) for account, value in expected.items()
+                if reported['fingerprints'].get(account) != value
+            )
+            workers[worker] = {
+                'consistent': not mismatched,
+                'mismatched': mismatched,
+                'reportedAt': reported['reportedAt']
+            }
+        if stale:
+            await self.redis.hdel(WORKERS_KEY, *stale)
+
+        return {
+            'consistent': all(worker['consistent'] for worker in workers.values()),
+            'expected': expected,
+            'workers': workers
+        }
+
+    async def _publish(self, message: dict):
+        await self.redis.publish(ACCOUNTS_CHANNEL, json.dumps({**message, 'origin': self.worker}))
+
+    def start(self):
+        self.tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._reconcile())]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        try:
+            await self.redis.hdel(WORKERS_KEY, self.worker)
+        except Exception as e:
+            logger.warning("Could not withdraw worker %s from the consistency report: %s", self.worker, e)
+
+    async def _handle(self, message: dict):
+        if message.get('origin') == self.worker:
+            return
+        if message.get('groups'):
+            self.expires_at = 0.0
+        account = message.get('account')
+        if account is not None:
+            if not 1 <= account <= len(self.exs):
+                logger.warning("Credentials changed for account %d, unknown to this worker until restart", account)
+                return
+            await self.sync([account])
+            await self.report()
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(ACCOUNTS_CHANNEL)
+                    # anything published while we were unsubscribed is lost
+                    self.expires_at = 0.0
+                    await self.sync()
+                    await self.report()
+                    async for message in pubsub.listen():
+                        if message['type'] == 'message':
+                            await self._handle(json.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Account change subscription dropped: %s", e)
+                await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    async def _reconcile(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+                await self.report()
+            except Exception as e:
+                logger.warning("Credential reconciliation failed: %s", e)
+
+    async def targets(self, payload: TradingViewRequest) -> Dict[int, float]:
+        """
+        Map each account the alert should trade to its order size in base units.
+        Raises ValueError when the alert names no valid account or group.
+        """
+        if payload.group is not None:
+            group = (await self.get_groups()).get(payload.group)
+            if group is None:
+                raise ValueError(f"Account group {payload.group} not found")
+            return {
+                member.account: min(payload.size * member.multiplier, member.maxSize or float('inf'))
+                for member in group.members
+            }
+
+        account = payload.account
+        if account is None:
+            suffix = payload.action.rsplit('_', 1)[-1]
+            if not suffix.isdigit():
+                raise ValueError(f"Action {payload.action} needs an account or a group")
+            account = int(suffix)
+        if not 1 <= account <= len(self.exs):
+            raise ValueError(f"Account {account} not found, there are {len(self.exs)}")
+        return {account: payload.size}
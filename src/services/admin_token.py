@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from src.config import ADMIN_TOKEN_TTL
+from src.utils.coalesce import Coalescer
+
+ADMIN_TOKEN_KEY = 'ADMIN_TOKEN'
+ADMIN_TOKEN_CHANNEL = 'ADMIN_TOKEN_CHANGED'
+DEFAULT_ADMIN_TOKEN = 'zxcvbnm1234'
+RESUBSCRIBE_DELAY = 1
+
+logger = logging.getLogger(__name__)
+
+
+class AdminTokenCache:
+    """
+    Per-worker copy of the admin token. Every worker subscribes to
+    ADMIN_TOKEN_CHANNEL and drops its copy when a new token is published;
+    `ttl` bounds staleness if an invalidation message is ever missed.
+    Concurrent misses share one GET, and a token read while an invalidation
+    arrives is returned to its callers but not kept.
+    """
+
+    def __init__(self, redis: Redis, ttl: float = ADMIN_TOKEN_TTL):
+        self.redis = redis
+        self.ttl = ttl
+        self.token: Optional[str] = None
+        self.expires_at = 0.0
+        self.generation = 0
+        self.requests = Coalescer()
+        self.task: Optional[asyncio.Task] = None
+
+    async def get(self) -> str:
+        if time.monotonic() < self.expires_at:
+            return self.token
+        return await self.requests.join(ADMIN_TOKEN_KEY, self._load)
+
+    async def set(self, token: str):
+        await self.redis.set(ADMIN_TOKEN_KEY, token)
+        self.invalidate()
+        await self.redis.publish(ADMIN_TOKEN_CHANNEL, '')
+
+    def invalidate(self):
+        self.generation += 1
+        self.expires_at = 0.0
+        # callers from now on must not share a read that may predate the change
+        self.requests.drop()
+
+    async def _load(self) -> str:
+        generation = self.generation
+        token = await self.redis.get(ADMIN_TOKEN_KEY)
+        token = DEFAULT_ADMIN_TOKEN if token is None else token
+        # an invalidation while the GET was out may mean the token read predates a change
+        if self.generation == generation:
+            self.token = token
+            self.expires_at = time.monotonic() + self.ttl
+        return token
+
+    def start(self):
+        self.task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(ADMIN_TOKEN_CHANNEL)
+                    # anything published while we were unsubscribed is lost
+                    self.invalidate()
+                    async for message in pubsub.listen():
+                        if message['type'] == 'message':
+                            self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Admin token subscription dropped: %s", e)
+                self.invalidate()
+                await asyncio.sleep(RESUBSCRIBE_DELAY)
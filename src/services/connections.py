@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import socket
+import ssl
+import time
+from types import SimpleNamespace
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from ccxt.async_support.base.exchange import Exchange
+
+from src.config import (
+    BYBIT_POOL_SIZE, BYBIT_KEEPALIVE_TIMEOUT, BYBIT_WARM_CONNECTIONS, BYBIT_PING_INTERVAL
+)
+from src.utils.metrics import EXCHANGE_CLOCK_OFFSET_SECONDS, EXCHANGE_CONNECTIONS
+
+SERVER_TIME_PATH = '/v5/market/time'
+
+logger = logging.getLogger(__name__)
+
+
+async def _on_request_start(session, ctx: SimpleNamespace, params: aiohttp.TraceRequestStartParams):
+    ctx.endpoint = params.url.path
+
+
+async def _on_connection_created(session, ctx: SimpleNamespace, params):
+    EXCHANGE_CONNECTIONS.labels(getattr(ctx, 'endpoint', 'unknown'), 'new').inc()
+
+
+async def _on_connection_reused(session, ctx: SimpleNamespace, params):
+    EXCHANGE_CONNECTIONS.labels(getattr(ctx, 'endpoint', 'unknown'), 'reused').inc()
+
+
+class ExchangeConnections:
+    """
+    One keep-alive HTTPS pool shared by every Bybit REST client.
+
+    `warm()` opens `warm` connections to each Bybit host in parallel with
+    server-time requests, and the background task repeats it every `interval`
+    seconds so idle connections never hit the keep-alive timeout. Each round
+    also measures the clock offset and hands it to the clients, keeping signed
+    requests inside `recvWindow`.
+    """
+
+    def __init__(
+            self,
+            exs: List[Exchange],
+            size: int = BYBIT_POOL_SIZE,
+            keepalive: float = BYBIT_KEEPALIVE_TIMEOUT,
+            warm: int = BYBIT_WARM_CONNECTIONS,
+            interval: float = BYBIT_PING_INTERVAL
+    ):
+        self.exs = exs
+        self.size = size
+        self.keepalive = keepalive
+        self.warm_connections = warm
+        self.interval = interval
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.task: Optional[asyncio.Task] = None
+        # when a warm-up last reached Bybit
+        self.warmed_at: Optional[float] = None
+
+    def open(self):
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(_on_request_start)
+        trace.on_connection_create_end.append(_on_connection_created)
+        trace.on_connection_reuseconn.append(_on_connection_reused)
+        # loading the CA bundle costs tens of milliseconds; do it once, not once per client
+        ssl_context = ssl.create_default_context(cafile=self.exs[0].cafile)
+        connector = aiohttp.TCPConnector(
+            ssl=ssl_context,
+            limit=self.size,
+            keepalive_timeout=self.keepalive,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True,
+            family=socket.AF_UNSPEC,
+            happy_eyeballs_delay=0
+        )
+        self.session = aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+        for ex in self.exs:
+            ex.ssl_context = ssl_context
+            ex.session = self.session
+            # ccxt must neither replace nor close the shared session
+            ex.own_session = False
+
+    def hosts(self) -> List[str]:
+        ex = self.exs[0]
+        urls = {ex.implode_hostname(ex.urls['api'][api]) for api in ('public', 'private')}
+        return sorted({f"{urlsplit(url).scheme}://{urlsplit(url).netloc}" for url in urls})
+
+    async def _server_time(self, host: str) -> Optional[float]:
+        """Offset of the local clock from Bybit's, in milliseconds, assuming a symmetric round-trip."""
+        try:
+            sent = time.time() * 1000
+            async with self.session.get(host + SERVER_TIME_PATH, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                body = await response.json(content_type=None)
+            received = time.time() * 1000
+            return (sent + received) / 2 - int(body['result']['timeNano']) / 1e6
+        except Exception as e:
+            logger.warning("Bybit connection warm-up against %s failed: %s", host, e)
+            return None
+
+    async def warm(self):
+        offsets = await asyncio.gather(*(
+            self._server_time(host) for host in self.hosts() for _ in range(self.warm_connections)
+        ))
+        offsets = sorted(offset for offset in offsets if offset is not None)
+        if not offsets:
+            return
+        offset = offsets[len(offsets) // 2]
+        self.warmed_at = time.time()
+        EXCHANGE_CLOCK_OFFSET_SECONDS.set(offset / 1000)
+        for ex in self.exs:
+            ex.options['timeDifference'] = int(offset)
+
+    def start(self):
+        self.task = asyncio.create_task(self._keep_warm())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _keep_warm(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.warm()
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+from typing import Dict, FrozenSet, Hashable, List, Optional, Set, Tuple
+
+from ccxt.pro import Exchange
+
+from src.services.positions import PositionStream, RECONNECT_DELAY, MAX_RECONNECT_DELAY
+from src.services.reads import ReadCache
+from src.utils.fanout import run_bounded
+from src.utils.metrics import STREAM_CONFLATED, STREAM_SUBSCRIBERS
+
+logger = logging.getLogger(__name__)
+
+# ccxt balance keys that are totals across currencies, not currencies
+BALANCE_SUMMARY_KEYS = frozenset({'info', 'free', 'used', 'total', 'timestamp', 'datetime', 'debt'})
+
+
+class Subscription:
+    """
+    One client's pending updates. Each key holds only the latest update for
+    it, so a client that falls behind skips intermediate values instead of
+    queueing them: memory stays bounded by the number of keys it watches.
+    """
+
+    def __init__(self, accounts: FrozenSet[int], symbols: FrozenSet[str]):
+        self.accounts = accounts
+        self.symbols = symbols
+        self.pending: Dict[Hashable, Tuple[str, str]] = {}
+        self.ready = asyncio.Event()
+
+    def put(self, key: Hashable, event: str, data: str):
+        if key in self.pending:
+            STREAM_CONFLATED.inc()
+        self.pending[key] = (event, data)
+        self.ready.set()
+
+    async def next(self) -> List[Tuple[str, str]]:
+        await self.ready.wait()
+        self.ready.clear()
+        batch, self.pending = list(self.pending.values()), {}
+        return batch
+
+
+class AccountFeed:
+    """
+    Pushes position and balance changes to any number of subscribed clients.
+
+    Positions come from the PositionStream every worker already runs;
+    balances from one private `wallet` stream per account, opened when the
+    first client asks for that account and kept open after. Each update is
+    encoded once and handed to every subscription that wants it, so
+    connected clients add no exchange traffic. Snapshots go through the
+    ReadCache, so clients that connect together share one request per account.
+    """
+
+    def __init__(self, exs: List[Exchange], positions: PositionStream, reads: ReadCache):
+        self.exs = exs
+        self.accounts = {ex: account for account, ex in enumerate(exs, 1)}
+        self.positions = positions
+        self.reads = reads
+        self.subscriptions: Dict[Exchange, Set[Subscription]] = {ex: set() for ex in exs}
+        # last update sent per account and symbol or currency, to skip repeats
+        self.sent: Dict[Tuple[Exchange, str, str], str] = {}
+        self.tasks: Dict[Exchange, asyncio.Task] = {}
+
+    def start(self):
+        self.positions.on_update(self._on_position)
+
+    async def stop(self):
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.tasks.clear()
+
+    def check(self, accounts: List[int]):
+        """Raises ValueError for an unknown account."""
+        unknown = [account for account in accounts if not 1 <= account <= len(self.exs)]
+        if unknown:
+            raise ValueError(f"Unknown accounts {unknown}, there are {len(self.exs)}")
+
+    def subscribe(self, accounts: List[int], symbols: List[str]) -> Subscription:
+        """Register a client; raises ValueError for an unknown account."""
+        self.check(accounts)
+        subscription = Subscription(frozenset(accounts or range(1, len(self.exs) + 1)), frozenset(symbols))
+        for account in subscription.accounts:
+            ex = self.exs[account - 1]
+            self.subscriptions[ex].add(subscription)
+            if ex.apiKey is not None and ex not in self.tasks:
+                self.tasks[ex] = asyncio.create_task(self._watch_balance(ex))
+        # the snapshot may come from a cache; the latest updates already seen follow it
+        for (ex, kind, name), encoded in self.sent.items():
+            if self.accounts[ex] in subscription.accounts and (kind != 'position' or name in subscription.symbols):
+                subscription.put((ex, kind, name), kind, encoded)
+        STREAM_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for account in subscription.accounts:
+            self.subscriptions[self.exs[account - 1]].discard(subscription)
+        STREAM_SUBSCRIBERS.dec()
+
+    async def snapshot(self, subscription: Subscription) -> Dict[int, dict]:
+        """Current balance and positions per account, as {"result": ...} or {"error": ...}."""
+
+        async def read(ex: Exchange) -> dict:
+            balance = await self.reads.get(ex, 'balance', None, ex.fetch_balance)
+            positions = await asyncio.gather(*(
+                self.reads.get(ex, 'position', symbol, lambda symbol=symbol: self.positions.fetch_position(ex, symbol))
+                for symbol in sorted(subscription.symbols)
+            ))
+            return {'balance': balance, 'positions': dict(zip(sorted(subscription.symbols), positions))}
+
+        return await run_bounded({
+            account: (lambda ex=self.exs[account - 1]: read(ex)) for account in sorted(subscription.accounts)
+        })
+
+    def _publish(self, ex: Exchange, kind: str, name: str, data: dict, symbol: Optional[str] = None):
+        key = (ex, kind, name)
+        if not self.subscriptions[ex]:
+            # nobody to encode for; a later subscriber gets a fresh snapshot, not this update
+            self.sent.pop(key, None)
+            return
+        encoded = json.dumps(data, default=str)
+        if self.sent.get(key) == encoded:
+            return
+        self.sent[key] = encoded
+        for subscription in self.subscriptions[ex]:
+            if symbol is None or symbol in subscription.symbols:
+                subscription.put(key, kind, encoded)
+
+    def _on_position(self, ex: Exchange, symbol: str, position: dict):
+        self._publish(ex, 'position', symbol, {
+            'account': self.accounts[ex], 'symbol': symbol, 'position': position
+        }, symbol)
+
+    def _on_balance(self, ex: Exchange, balance: dict):
+        for currency, amounts in balance.items():
+            if currency not in BALANCE_SUMMARY_KEYS:
+                self._publish(ex, 'balance', currency, {
+                    'account': self.accounts[ex], 'currency': currency, 'balance': amounts
+                })
+
+    async def _watch_balance(self, ex: Exchange):
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                self._on_balance(ex, await ex.watch_balance())
+                delay = RECONNECT_DELAY
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Balance stream for account %d dropped: %s", self.accounts[ex], e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from redis.asyncio import Redis
+
+from src.config import IDEMPOTENCY_LEASE, IDEMPOTENCY_MAX_WAIT, IDEMPOTENCY_WINDOW
+from src.schemas.tradingview import TradingViewRequest
+
+IDEMPOTENCY_PREFIX = 'WEBHOOK'
+PENDING = '__pending__'
+POLL_INTERVAL = 0.05
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookDeduplicator:
+    """
+    Suppresses repeated deliveries of the same TradingView alert.
+
+    The first delivery claims the alert's key with SET NX and stores its
+    result under that key for `window` seconds; later deliveries are answered
+    from that result, waiting for it if the first one is still executing.
+    The claim is a lease of `lease` seconds, renewed while the execution runs,
+    so a slow order is not placed again by a retry; it only lapses if the
+    worker dies. A later delivery waits at most `max_wait` seconds and then
+    gets a 409. Failed executions, including group alerts no account
+    executed, release the key so a retry can go through. If Redis is
+    unreachable, alerts are executed without the check.
+    """
+
+    def __init__(
+            self,
+            redis: Redis,
+            window: int = IDEMPOTENCY_WINDOW,
+            lease: int = IDEMPOTENCY_LEASE,
+            max_wait: float = IDEMPOTENCY_MAX_WAIT
+    ):
+        self.redis = redis
+        self.window = window
+        self.lease = lease
+        self.max_wait = max_wait
+
+    @staticmethod
+    def key(payload: TradingViewRequest) -> str:
+        if payload.alert_id is not None:
+            return f'{IDEMPOTENCY_PREFIX}:ID:{payload.alert_id}'
+        fingerprint = hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+        return f'{IDEMPOTENCY_PREFIX}:FP:{fingerprint}'
+
+    async def run(self, payload: TradingViewRequest, job: Callable[[], Awaitable[Any]]) -> Any:
+        if self.window <= 0:
+            return await job()
+
+        key = self.key(payload)
+        try:
+            claimed = await self._claim(key)
+        except Exception as e:
+            # a Redis outage must not stop orders; a retry delivered meanwhile may go through twice
+            logger.warning("Duplicate check unavailable, executing %s unchecked: %s", key, e)
+            return await job()
+        if claimed is not True:
+            return claimed
+
+        renewal = asyncio.create_task(self._renew(key))
+        try:
+            result = await job()
+        except BaseException:
+            await self._release(key)
+            raise
+        finally:
+            renewal.cancel()
+            await asyncio.gather(renewal, return_exceptions=True)
+
+        if _failed(result):
+            await self._release(key)
+            return result
+        value = json.dumps(jsonable_encoder(result))
+        try:
+            # the claim can still have lapsed, e.g. while Redis was unreachable; the result is stored regardless
+            if not await self.redis.set(key, value, ex=self.window, xx=True):
+                await self.redis.set(key, value, ex=self.window)
+        except Exception as e:
+            logger.warning("Could not store the result of %s: %s", key, e)
+        return result
+
+    async def _claim(self, key: str) -> Any:
+        """True once the key is claimed, else the earlier delivery's result, or a 409 if it does not finish in time."""
+        deadline = time.monotonic() + self.max_wait
+        while not await self.redis.set(key, PENDING, nx=True, ex=self.lease):
+            cached = await self.redis.get(key)
+            if cached is None:
+                continue
+            if cached != PENDING:
+                return json.loads(cached)
+            if time.monotonic() >= deadline:
+                return HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="The same alert is still being executed"
+                )
+            await asyncio.sleep(POLL_INTERVAL)
+        return True
+
+    async def _release(self, key: str):
+        try:
+            await self.redis.delete(key)
+        except Exception as e:
+            logger.warning("Could not release %s: %s", key, e)
+
+    async def _renew(self, key: str):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await self.redis.expire(key, self.lease)
+            except Exception as e:
+                logger.warning("Could not renew the claim on %s: %s", key, e)
+
+
+def _failed(result: Any) -> bool:
+    """Whether a retry should go through: an error, or a group alert no account executed."""
+    if isinstance(result, HTTPException):
+        return True
+    return isinstance(result, dict) and 'accounts' in result and result['succeeded'] == 0
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from ulid import ULID
+
+from src.config import JOURNAL_QUEUE_SIZE, JOURNAL_BATCH_SIZE, JOURNAL_FLUSH_INTERVAL
+from src.database import models
+from src.schemas.tradingview import TradingViewRequest
+from src.utils.metrics import JOURNAL_FLUSH_SECONDS, JOURNAL_QUEUE_DEPTH, JOURNAL_ROWS
+
+JOURNAL_TABLES = (models.WebhookLog.__table__, models.TradeEvent.__table__)
+
+logger = logging.getLogger(__name__)
+
+
+def _timestamp(value: float) -> datetime:
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+def _plain(value: Any) -> Any:
+    # exchange responses may carry exceptions or other objects json cannot encode
+    return json.loads(json.dumps(value, default=str))
+
+
+class TradeJournal:
+    """
+    Write-behind audit trail of webhooks, order decisions and exchange responses.
+
+    Recording only appends to a bounded in-memory queue and never waits: when
+    the queue is full the row is dropped and counted. A background task drains
+    the queue in batches of up to `batch_size` rows, or whatever arrived within
+    `flush_interval`, and bulk-inserts them. `stop()` writes out everything
+    still queued. Without a sessionmaker the journal records nothing.
+    """
+
+    def __init__(
+            self,
+            sessionmaker: Optional[async_sessionmaker] = None,
+            max_queue: int = JOURNAL_QUEUE_SIZE,
+            batch_size: int = JOURNAL_BATCH_SIZE,
+            flush_interval: float = JOURNAL_FLUSH_INTERVAL
+    ):
+        self.sessionmaker = sessionmaker
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue[Tuple[Type[models.Base], dict]] = asyncio.Queue(max_queue)
+        self.task: Optional[asyncio.Task] = None
+        # rows taken off the queue by the writer, and the insert in flight
+        self.pending: List[Tuple[Type[models.Base], dict]] = []
+        self.flushing: Optional[asyncio.Future] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sessionmaker is not None
+
+    async def open(self):
+        """Create the journal tables if missing; the journal turns itself off if the database is unreachable."""
+        if not self.enabled:
+            return
+        try:
+            async with self.sessionmaker() as session:
+                await session.run_sync(
+                    lambda sync_session: models.Base.metadata.create_all(sync_session.connection(), JOURNAL_TABLES)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning("Trade journal disabled, database unavailable: %s", e)
+            self.sessionmaker = None
+
+    def _put(self, model: Type[models.Base], row: dict):
+        try:
+            self.queue.put_nowait((model, row))
+        except asyncio.QueueFull:
+            JOURNAL_ROWS.labels('dropped').inc()
+            return
+        JOURNAL_QUEUE_DEPTH.set(self.queue.qsize())
+
+    def webhook(self, payload: TradingViewRequest) -> Optional[str]:
+        """Record a received alert and return the id its events should reference."""
+        if not self.enabled:
+            return None
+        webhook_id = str(ULID())
+        self._put(models.WebhookLog, {
+            'id': webhook_id,
+            'received_at': time.time(),
+            'alert_id': payload.alert_id,
+            'action': str(payload.action),
+            'symbol': payload.symbol,
+            'payload': payload.model_dump(mode='json'),
+        })
+        return webhook_id
+
+    def event(
+            self,
+            webhook_id: Optional[str],
+            kind: str,
+            account: Optional[int] = None,
+            symbol: Optional[str] = None,
+            data: Any = None
+    ):
+        if not self.enabled:
+            return
+        self._put(models.TradeEvent, {
+            'id': str(ULID()),
+            'created_at': time.time(),
+            'webhook_id': webhook_id,
+            'kind': kind,
+            'account': account,
+            'symbol': symbol,
+            'data': data,
+        })
+
+    def start(self):
+        if self.enabled:
+            self.task = asyncio.create_task(self._write())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        if self.flushing is not None:
+            await self.flushing
+        batch, self.pending = self.pending, []
+        while batch or not self.queue.empty():
+            await self._flush(self._drain(batch))
+            batch = []
+
+    def _drain(self, batch: List[Tuple[Type[models.Base], dict]]) -> List[Tuple[Type[models.Base], dict]]:
+        while len(batch) < self.batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        JOURNAL_QUEUE_DEPTH.set(self.queue.qsize())
+        return batch
+
+    async def _flush(self, batch: List[Tuple[Type[models.Base], dict]]):
+        rows: Dict[Type[models.Base], List[dict]] = defaultdict(list)
+        for model, row in batch:
+            if model is models.WebhookLog:
+                row = {**row, 'received_at': _timestamp(row['received_at'])}
+            else:
+                row = {**row, 'created_at': _timestamp(row['created_at']), 'data': _plain(row['data'])}
+            rows[model].append(row)
+
+        start = time.perf_counter()
+        try:
+            async with self.sessionmaker() as session:
+                # webhooks first, so their events never precede them
+                for model in (models.WebhookLog, models.TradeEvent):
+                    if rows[model]:
+                        await session.execute(insert(model), rows[model])
+                await session.commit()
+            JOURNAL_ROWS.labels('written').inc(len(batch))
+        except Exception as e:
+            logger.error("Trade journal failed to write %d rows: %s", len(batch), e)
+            JOURNAL_ROWS.labels('failed').inc(len(batch))
+        finally:
+            JOURNAL_FLUSH_SECONDS.observe(time.perf_counter() - start)
+
+    async def _write(self):
+        while True:
+            self.pending.append(await self.queue.get())
+            deadline = time.monotonic() + self.flush_interval
+            self._drain(self.pending)
+            # top the batch up until it is full or the oldest row has waited flush_interval
+            while len(self.pending) < self.batch_size and (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    self.pending.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+                self._drain(self.pending)
+            batch, self.pending = self.pending, []
+            # shielded: stop() waits for an insert in flight instead of abandoning it
+            self.flushing = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self.flushing)
+            self.flushing = None
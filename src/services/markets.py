@@ -0,0 +1,141 @@
+import asyncio
+import copy
+import json
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from ccxt.async_support.base.exchange import Exchange, __version__ as ccxt_version
+from redis.asyncio import Redis
+
+from src.config import MARKETS_SNAPSHOT_TTL, MARKETS_REFRESH_INTERVAL
+from src.services.symbols import SymbolIndex
+from src.utils.orders import OrderSpecs
+
+MARKETS_SNAPSHOT_KEY = 'BYBIT_MARKETS_SNAPSHOT'
+# bump when the snapshot layout changes; ccxt upgrades may change the market structure
+SNAPSHOT_FORMAT = f'1:{ccxt_version}'
+
+logger = logging.getLogger(__name__)
+
+
+class MarketCatalogue:
+    """
+    One market catalogue shared by every account client.
+
+    The catalogue is downloaded through the first client only and handed to the
+    others by reference. Every download is saved to Redis as a versioned
+    snapshot so a restart can warm-start from it, while a background task keeps
+    it fresh. The markets, symbol index, order-spec table and snapshot are
+    built on a worker thread, which takes most of a second for a full
+    catalogue; the event loop only swaps the references, without an
+    intervening await, so requests never observe a half-updated catalogue.
+    """
+
+    def __init__(
+            self,
+            exs: List[Exchange],
+            redis: Redis,
+            ttl: int = MARKETS_SNAPSHOT_TTL,
+            refresh_interval: float = MARKETS_REFRESH_INTERVAL
+    ):
+        self.exs = exs
+        self.redis = redis
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.version: Optional[int] = None
+        self.symbols = SymbolIndex({})
+        self.specs = OrderSpecs({})
+        self.task: Optional[asyncio.Task] = None
+
+    async def load(self) -> bool:
+        """
+        Warm-start from the snapshot, or download the catalogue if there is none.
+        Returns whether the snapshot was used.
+        """
+        if await self.restore():
+            return True
+        await self.refresh()
+        return False
+
+    async def refresh(self):
+        source = self.exs[0]
+        # ccxt's load_markets fetches the currencies and only then the markets; neither needs the other
+        currencies, markets = await asyncio.gather(source.fetch_currencies(), source.fetch_markets())
+        version = int(time.time())
+        staging, symbols, specs, raw = await asyncio.to_thread(self._build, markets, currencies, version, True)
+        self._swap(staging, symbols, specs, version)
+        await self.redis.set(MARKETS_SNAPSHOT_KEY, raw, ex=self.ttl)
+
+    async def restore(self) -> bool:
+        raw = await self.redis.get(MARKETS_SNAPSHOT_KEY)
+        if raw is None:
+            return False
+        built = await asyncio.to_thread(self._build_from_snapshot, raw)
+        if built is None:
+            return False
+        version, staging, symbols, specs = built
+        self._swap(staging, symbols, specs, version)
+        return True
+
+    def share(self, version: int):
+        """Hand the first client's markets, as loaded, to the others and rebuild what is derived from them."""
+        source = self.exs[0]
+        self._swap(source, SymbolIndex(source.markets), OrderSpecs(source.markets), version)
+
+    def _build(
+            self,
+            markets: list,
+            currencies: dict,
+            version: int,
+            serialize: bool
+    ) -> Tuple[Exchange, SymbolIndex, OrderSpecs, Optional[str]]:
+        """
+        Runs on a worker thread: set the markets on a copy of the first client,
+        which the clients serving requests never see half-updated, and build
+        the index, the order specs and optionally the snapshot from it.
+        """
+        staging = copy.copy(self.exs[0])
+        # the copy shares the client's session; it must not warn about closing it when collected
+        staging.session = None
+        staging.set_markets(markets, currencies)
+        raw = json.dumps({
+            'format': SNAPSHOT_FORMAT,
+            'version': version,
+            'markets': staging.markets,
+            'currencies': staging.currencies,
+        }) if serialize else None
+        return staging, SymbolIndex(staging.markets), OrderSpecs(staging.markets), raw
+
+    def _build_from_snapshot(self, raw: bytes) -> Optional[Tuple[int, Exchange, SymbolIndex, OrderSpecs]]:
+        snapshot = json.loads(raw)
+        if snapshot['format'] != SNAPSHOT_FORMAT:
+            return None
+        staging, symbols, specs, _ = self._build(snapshot['markets'], snapshot['currencies'], snapshot['version'],
+                                                 False)
+        return snapshot['version'], staging, symbols, specs
+
+    def _swap(self, staging: Exchange, symbols: SymbolIndex, specs: OrderSpecs, version: int):
+        for ex in self.exs:
+            if ex is not staging:
+                ex.set_markets_from_exchange(staging)
+        self.symbols, self.specs, self.version = symbols, specs, version
+
+    def start(self):
+        self.task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    async def _refresh_periodically(self):
+        # a snapshot written by another worker moments ago does not need refreshing yet
+        delay = max(0.0, self.version + self.refresh_interval - time.time())
+        while True:
+            await asyncio.sleep(delay)
+            delay = self.refresh_interval
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.exception("Error refreshing markets: %s", e)
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from ccxt.pro import Exchange
+
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 30
+
+logger = logging.getLogger(__name__)
+
+
+class PositionStream:
+    """
+    Per-account, per-symbol position table fed by Bybit's private `position`
+    and `execution` streams.
+
+    A cached position is served while the account's stream is live and no
+    execution for the symbol has been seen since the entry was written,
+    however old it is: Bybit only pushes a position when it changes, so an
+    unchanged or flat position stays valid. A dead connection fails the
+    stream (ccxt pings it), which drops every entry of the account until it
+    is back. Anything not cached falls back to REST, and a REST result is
+    only kept if no stream update or execution for the symbol arrived while
+    it was out.
+    Listeners registered with `on_invalidate` hear about every order or fill
+    the stream learns of, with the account's client; those registered with
+    `on_update` receive every position read from the stream or over REST.
+    """
+
+    def __init__(self, exs: List[Exchange]):
+        self.exs = exs
+        self.books: Dict[Exchange, Dict[str, dict]] = {}
+        self.dirty: Dict[Exchange, Set[str]] = {}
+        # bumped by every stream update and execution, to tell REST results that predate one
+        self.generations: Dict[Tuple[Exchange, str], int] = {}
+        self.live: Set[Exchange] = set()
+        self.tasks: Dict[Exchange, List[asyncio.Task]] = {}
+        self.listeners: List[Callable[[Exchange], None]] = []
+        self.updates: List[Callable[[Exchange, str, dict], None]] = []
+
+    def start(self):
+        for ex in self.exs:
+            self.watch(ex)
+
+    def watch(self, ex: Exchange):
+        self.books[ex] = {}
+        self.dirty[ex] = set()
+        if ex.apiKey is None:
+            return
+        self.tasks[ex] = [
+            asyncio.create_task(self._watch_positions(ex)),
+            asyncio.create_task(self._watch_executions(ex)),
+        ]
+
+    async def unwatch(self, ex: Exchange):
+        tasks = self.tasks.pop(ex, [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.live.discard(ex)
+        ex.positions = None
+        await ex.close_ws_clients()
+
+    async def restart(self, ex: Exchange):
+        await self.unwatch(ex)
+        self.watch(ex)
+
+    async def stop(self):
+        for ex in list(self.tasks):
+            await self.unwatch(ex)
+
+    def on_invalidate(self, listener: Callable[[Exchange], None]):
+        self.listeners.append(listener)
+
+    def on_update(self, listener: Callable[[Exchange, str, dict], None]):
+        self.updates.append(listener)
+
+    def invalidate(self, ex: Exchange, symbol: str):
+        self._advance(ex, symbol)
+        self.dirty.setdefault(ex, set()).add(symbol)
+        for listener in self.listeners:
+            listener(ex)
+
+    def cached(self, ex: Exchange, symbol: str) -> Optional[dict]:
+        if ex not in self.live or symbol in self.dirty[ex]:
+            return None
+        return self.books[ex].get(symbol)
+
+    async def fetch_position(self, ex: Exchange, symbol: str) -> dict:
+        position = self.cached(ex, symbol)
+        if position is None:
+            generation = self.generations.get((ex, symbol), 0)
+            position = await ex.fetch_position(symbol)
+            # a stream update or fill while the request was out is newer than its result
+            if self.generations.get((ex, symbol), 0) == generation:
+                self._store(ex, symbol, position)
+        return position
+
+    def _advance(self, ex: Exchange, symbol: str):
+        self.generations[ex, symbol] = self.generations.get((ex, symbol), 0) + 1
+
+    def _store(self, ex: Exchange, symbol: str, position: dict):
+        self.books.setdefault(ex, {})[symbol] = position
+        self.dirty.setdefault(ex, set()).discard(symbol)
+        for listener in self.updates:
+            listener(ex, symbol, position)
+
+    def _drop(self, ex: Exchange):
+        self.live.discard(ex)
+        self.books[ex].clear()
+        # force ccxt to take a fresh REST snapshot on reconnect
+        ex.positions = None
+
+    async def _watch_positions(self, ex: Exchange):
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                positions = await ex.watch_positions()
+                if ex not in self.live:
+                    self.books[ex].clear()
+                    self.live.add(ex)
+                    delay = RECONNECT_DELAY
+                for position in positions:
+                    self._advance(ex, position['symbol'])
+                    self._store(ex, position['symbol'], position)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Position stream for account %d dropped: %s", self.exs.index(ex) + 1, e)
+                self._drop(ex)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def _watch_executions(self, ex: Exchange):
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                for trade in await ex.watch_my_trades():
+                    self.invalidate(ex, trade['symbol'])
+                delay = RECONNECT_DELAY
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Execution stream for account %d dropped: %s", self.exs.index(ex) + 1, e)
+                self._drop(ex)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import Awaitable, Dict, List
+
+from ccxt.async_support.base.exchange import Exchange
+
+from src.services.connections import ExchangeConnections
+from src.services.markets import MarketCatalogue
+from src.services.positions import PositionStream
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """
+    Whether the order path is warm. The app starts serving as soon as the
+    market catalogue is loaded, since an order cannot be built without it;
+    warming the connections to Bybit and opening the position streams
+    continues in the background, and orders sent meanwhile only take longer.
+
+    The app is ready once the markets are loaded and the connections warm.
+    Position streams are reported but not required: without them orders
+    read positions over REST, and a Bybit websocket outage must not take
+    the only worker out of rotation.
+    """
+
+    def __init__(
+            self,
+            exs: List[Exchange],
+            markets: MarketCatalogue,
+            connections: ExchangeConnections,
+            positions: PositionStream
+    ):
+        self.exs = exs
+        self.markets = markets
+        self.connections = connections
+        self.positions = positions
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    def run(self, name: str, step: Awaitable):
+        """Run a startup step in the background, cancelled at shutdown if still running."""
+        task = self.tasks[name] = asyncio.ensure_future(step)
+        task.add_done_callback(lambda done: self._report(name, done))
+
+    def checks(self) -> Dict[str, bool]:
+        return {
+            'markets': self.markets.version is not None,
+            'connections': self.connections.warmed_at is not None,
+        }
+
+    def status(self) -> dict:
+        keyed = [ex for ex in self.exs if ex.apiKey is not None]
+        checks = self.checks()
+        return {
+            'ready': all(checks.values()),
+            'checks': checks,
+            'positionStreams': f"{sum(ex in self.positions.live for ex in keyed)}/{len(keyed)}",
+            'marketsVersion': self.markets.version,
+        }
+
+    async def stop(self):
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _report(name: str, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Startup step %s failed: %s", name, task.exception())
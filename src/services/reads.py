@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from ccxt.async_support.base.exchange import Exchange
+
+from src.config import READ_CACHE_TTL, READ_CACHE_STALE, READ_CACHE_SIZE
+from src.utils.coalesce import Coalescer
+from src.utils.metrics import READ_CACHE_REQUESTS
+
+Key = Tuple[Exchange, str, Optional[str]]
+
+
+class ReadCache:
+    """
+    Read-through cache for account reads, keyed by account, endpoint and symbol.
+
+    A result younger than `ttl` is served as is. Until it is `ttl + stale`
+    old it is still served, while a single background request refreshes it.
+    Concurrent misses for the same key share one upstream request. Errors
+    are never cached. `invalidate()` makes every entry of an account unusable
+    at once, including results of requests already in flight, so nothing
+    read before an order or leverage change is served after it.
+
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, ttl: float = READ_CACHE_TTL, stale: float = READ_CACHE_STALE, maxsize: int = READ_CACHE_SIZE):
+        self.ttl = ttl
+        self.stale = stale
+        self.maxsize = maxsize
+        # key -> (value, fetched at, account generation it was fetched in)
+        self.entries: OrderedDict[Key, Tuple[Any, float, int]] = OrderedDict()
+        self.requests = Coalescer()
+        self.generations: Dict[Hashable, int] = {}
+
+    async def get(
+            self,
+            ex: Exchange,
+            endpoint: str,
+            symbol: Optional[str],
+            fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        key = (ex, endpoint, symbol)
+        entry = self.entries.get(key)
+        if entry is not None and entry[2] == self.generations.get(ex, 0):
+            age = time.monotonic() - entry[1]
+            if age < self.ttl:
+                self.entries.move_to_end(key)
+                READ_CACHE_REQUESTS.labels(endpoint, 'hit').inc()
+                return entry[0]
+            if age < self.ttl + self.stale:
+                self.entries.move_to_end(key)
+                READ_CACHE_REQUESTS.labels(endpoint, 'stale').inc()
+                if key not in self.requests:
+                    self.requests.start(key, self._loader(key, fetch))
+                return entry[0]
+
+        READ_CACHE_REQUESTS.labels(endpoint, 'coalesced' if key in self.requests else 'miss').inc()
+        return await self.requests.join(key, self._loader(key, fetch))
+
+    def invalidate(self, ex: Exchange):
+        self.generations[ex] = self.generations.get(ex, 0) + 1
+        # reads from now on must not share a request that may predate the change
+        self.requests.drop(lambda key: key[0] == ex)
+
+    def _loader(self, key: Key, fetch: Callable[[], Awaitable[Any]]) -> Callable[[], Awaitable[Any]]:
+        generation = self.generations.get(key[0], 0)
+
+        async def load():
+            value = await fetch()
+            # an invalidation while the request was out may mean the value predates a change
+            if self.generations.get(key[0], 0) == generation:
+                self.entries[key] = (value, time.monotonic(), generation)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+            return value
+
+        return load
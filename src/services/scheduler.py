@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, TypeVar
+
+from redis.asyncio import Redis
+
+from src.config import ORDER_LOCK_LEASE, ORDER_LOCK_WAIT
+
+T = TypeVar('T')
+
+WAIT_SAMPLES = 1000
+ORDER_LOCK_KEY = 'ORDER_LOCK:{}'
+# the worker that last ran a job for the key
+ORDER_LOCK_LAST_KEY = 'ORDER_LOCK_LAST:{}'
+LOCK_POLL_INTERVAL = 0.01
+
+logger = logging.getLogger(__name__)
+
+
+class KeyedScheduler:
+    """
+    Runs jobs one at a time, in arrival order, per key, and concurrently across keys.
+
+    asyncio.Lock hands itself to waiters first-in first-out, so a lock per key
+    gives strict ordering. Locks are dropped once their key has nothing queued.
+
+    With Redis, each job also holds a Redis lock for its key, so workers do not
+    run jobs for the same key at the same time. The lock is a lease of `lease`
+    seconds, renewed while the job runs. Across workers the order is whoever
+    takes the lock first. A job that follows one run by another worker first
+    calls the `on_handover` listeners with its key, since this worker's
+    streams may not have seen that job's fills yet. If Redis is unreachable,
+    or the lock is not free within `wait` seconds, the job runs anyway
+    without it.
+    """
+
+    def __init__(self, redis: Optional[Redis] = None, lease: float = ORDER_LOCK_LEASE, wait: float = ORDER_LOCK_WAIT):
+        self.redis = redis
+        self.lease = lease
+        self.wait = wait
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.handovers: List[Callable[[Hashable], None]] = []
+        self.locks: Dict[Hashable, asyncio.Lock] = {}
+        self.depths: Dict[Hashable, int] = {}
+        self.waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.jobs = 0
+        self.max_depth = 0
+
+    async def run(self, key: Hashable, job: Callable[[], Awaitable[T]]) -> T:
+        lock = self.locks.setdefault(key, asyncio.Lock())
+        depth = self.depths.get(key, 0) + 1
+        self.depths[key] = depth
+        self.max_depth = max(self.max_depth, depth)
+        queued_at = time.monotonic()
+        try:
+            async with lock, self._across_workers(key):
+                self.waits.append(time.monotonic() - queued_at)
+                self.jobs += 1
+                return await job()
+        finally:
+            self.depths[key] -= 1
+            if not self.depths[key]:
+                del self.depths[key]
+                del self.locks[key]
+
+    def on_handover(self, listener: Callable[[Hashable], None]):
+        self.handovers.append(listener)
+
+    @asynccontextmanager
+    async def _across_workers(self, key: Hashable) -> AsyncIterator[None]:
+        if self.redis is None:
+            yield
+            return
+        name = _name(key)
+        lock = self.redis.lock(ORDER_LOCK_KEY.format(name), timeout=self.lease, sleep=LOCK_POLL_INTERVAL,
+                               blocking_timeout=self.wait)
+        try:
+            acquired = await lock.acquire()
+            if not acquired:
+                logger.warning("Order lock %s still taken after %ss, running without it", name, self.wait)
+            last = await self.redis.get(ORDER_LOCK_LAST_KEY.format(name))
+        except Exception as e:
+            logger.warning("Order lock %s unavailable, running without it: %s", name, e)
+            acquired, last = False, None
+        if last is not None and last != self.worker:
+            for listener in self.handovers:
+                listener(key)
+        renewal = asyncio.create_task(self._renew(lock)) if acquired else None
+        try:
+            yield
+        finally:
+            if renewal is not None:
+                renewal.cancel()
+                await asyncio.gather(renewal, return_exceptions=True)
+            try:
+                await self.redis.set(ORDER_LOCK_LAST_KEY.format(name), self.worker)
+                if acquired:
+                    await lock.release()
+            except Exception as e:
+                logger.warning("Could not release order lock %s: %s", name, e)
+
+    async def _renew(self, lock):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await lock.reacquire()
+            except Exception as e:
+                logger.warning("Could not renew order lock %s: %s", lock.name, e)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self.waits)
+        return {
+            "jobs": self.jobs,
+            "maxDepth": self.max_depth,
+            "queues": {_name(key): depth for key, depth in self.depths.items()},
+            "wait": {
+                "samples": len(waits),
+                "p50": waits[len(waits) // 2] if waits else 0.0,
+                "p99": waits[int(len(waits) * 0.99)] if waits else 0.0,
+                "max": waits[-1] if waits else 0.0,
+            },
+        }
+
+
+def _name(key: Hashable) -> str:
+    return ":".join(map(str, key)) if isinstance(key, tuple) else str(key)
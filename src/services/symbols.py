@@ -0,0 +1,59 @@
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import chain, islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+NGRAM = 3
+
+
+class SymbolIndex:
+    """
+    Substring index over active contract markets.
+
+    Symbols are kept sorted by their lowercased key. Every substring of up to
+    NGRAM characters of a key maps to the ids of the symbols containing it, so
+    keywords up to NGRAM characters are a single dict lookup and longer ones
+    scan only the postings of their rarest n-gram. Prefix matches are a
+    contiguous id range found by bisection.
+    """
+
+    def __init__(self, markets: dict):
+        symbols = sorted(
+            (symbol for symbol, market in markets.items() if market['active'] and market['contract']),
+            key=str.lower
+        )
+        self.symbols: Tuple[str, ...] = tuple(symbols)
+        self.keys: Tuple[str, ...] = tuple(symbol.lower() for symbol in symbols)
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for idx, key in enumerate(self.keys):
+            grams = {key[start:start + size] for size in range(1, NGRAM + 1) for start in range(len(key) - size + 1)}
+            for gram in grams:
+                postings[gram].append(idx)
+        self.postings: Dict[str, Tuple[int, ...]] = {gram: tuple(ids) for gram, ids in postings.items()}
+
+    def _prefixed(self, keyword: str) -> range:
+        return range(bisect_left(self.keys, keyword), bisect_left(self.keys, keyword + '\uffff'))
+
+    def _matches(self, keyword: str) -> Iterable[int]:
+        if not keyword:
+            return range(len(self.symbols))
+        if len(keyword) <= NGRAM:
+            return self.postings.get(keyword, ())
+        candidates = min(
+            (self.postings.get(keyword[start:start + NGRAM], ()) for start in range(len(keyword) - NGRAM + 1)),
+            key=len
+        )
+        return (idx for idx in candidates if keyword in self.keys[idx])
+
+    def search(self, keyword: str, limit: Optional[int] = None, rank: bool = False) -> List[str]:
+        """
+        Symbols containing `keyword`, case-insensitively, in alphabetical order.
+        With `rank`, symbols starting with `keyword` come before the other matches.
+        """
+        keyword = keyword.lower()
+        matches = self._matches(keyword)
+        if rank:
+            prefixed = self._prefixed(keyword)
+            matches = chain(prefixed, (idx for idx in matches if idx not in prefixed))
+        return [self.symbols[idx] for idx in islice(matches, limit)]
@@ -0,0 +1,49 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar('T')
+
+logger = logging.getLogger(__name__)
+
+
+class Coalescer:
+    """
+    Requests in flight by key, so concurrent callers asking for the same
+    thing share one request instead of each sending their own.
+
+    A request is shielded from its callers: one caller giving up does not
+    cancel it for the others. It is forgotten once done, and `drop()` makes
+    later callers send a new one, e.g. when its result may predate a change.
+    """
+
+    def __init__(self):
+        self.inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.inflight
+
+    def start(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> asyncio.Future:
+        """Send a new request for `key`, which later callers share; a request already in flight is not joined."""
+        request = self.inflight[key] = asyncio.ensure_future(call())
+        request.add_done_callback(lambda done: self._forget(key, done))
+        return request
+
+    async def join(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """The result of the request in flight for `key`, or of a new one made with `call`."""
+        request = self.inflight.get(key)
+        if request is None:
+            request = self.start(key, call)
+        return await asyncio.shield(request)
+
+    def drop(self, match: Optional[Callable[[Hashable], bool]] = None):
+        """Stop sharing the requests whose key matches, all of them by default; their callers still get the results."""
+        for key in [key for key in self.inflight if match is None or match(key)]:
+            del self.inflight[key]
+
+    def _forget(self, key: Hashable, request: asyncio.Future):
+        if self.inflight.get(key) is request:
+            del self.inflight[key]
+        # every caller may have given up already; mark the outcome as seen
+        if not request.cancelled() and request.exception() is not None:
+            logger.debug("Shared request %s failed: %s", key, request.exception())
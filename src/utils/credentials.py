@@ -1,3 +1,6 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 from typing import Type
@@ -6,13 +9,23 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 
+from src.config import AUTH_CACHE_SIZE, AUTH_CACHE_TTL, PASSWORD_HASH_WORKERS
 from src.database import models
 from src.database.database import get_db
+from src.utils.cache import TTLCache
 from src.utils.handler import handle_jwt_error, handle_error, handle_none_value
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bounds how many bcrypt rounds run at once; the rest queue here instead of on the event loop
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+# decoded JWT payloads by token, and users (with their accounts loaded) by username
+token_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+user_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
 
 SECRET_KEY = "c1b3e4b3-4b3c-4b3e-8b3c-4b3e4b3c4b3e"
 ALGORITHM = "HS256"
@@ -23,9 +36,22 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 @handle_none_value("User")
 @handle_error
-def get_user_by_username(db: Session, username: str) -> Type[models.User] | models.User | None:
-    user = db.query(models.User).join(models.UserAccount).filter_by(username=username).first()
-    return user
+async def get_user_by_username(db: AsyncSession, username: str) -> Type[models.User] | models.User | None:
+    result = await db.execute(
+        select(models.User).join(models.User.account).options(
+            contains_eager(models.User.account)
+        ).filter(models.UserAccount.username == username)
+    )
+    return result.unique().scalars().first()
+
+
+@event.listens_for(models.User, 'after_update')
+@event.listens_for(models.User, 'after_delete')
+@event.listens_for(models.UserAccount, 'after_insert')
+@event.listens_for(models.UserAccount, 'after_update')
+@event.listens_for(models.UserAccount, 'after_delete')
+def _invalidate_users(mapper, connection, target):
+    user_cache.clear()
 
 
 def hash_password(password: str) -> str:
@@ -36,10 +62,20 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def authenticate_user(db: Session, username: str, password: str) -> models.User:
-    user = get_user_by_username(db, username)
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(password_executor, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(
+        password_executor, verify_password, plain_password, hashed_password
+    )
+
+
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> models.User:
+    user = await get_user_by_username(db, username)
     truth_password = user.account[0].password
-    if not verify_password(password, truth_password):
+    if not await verify_password_async(password, truth_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
@@ -58,12 +94,17 @@ def create_access_token(data: dict, period=timedelta(minutes=EXPIRE_IN_MIN)) ->
 
 @handle_jwt_error
 def decode_token(token: str) -> dict:
-    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # never serve a payload past the token's own expiry
+        token_cache.set(token, payload, payload['exp'] - time.time() if 'exp' in payload else None)
+    return payload
 
 
 async def get_current_user(
         token: Annotated[str, Depends(oauth2_scheme)],
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ) -> models.User:
     payload = decode_token(token)
     username: str = payload.get("sub")
@@ -74,6 +115,9 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = get_user_by_username(db, username)
+    user = user_cache.get(username)
+    if user is None:
+        user = await get_user_by_username(db, username)
+        user_cache.set(username, user)
 
     return user
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ccxt.async_support import Exchange
+
+from src.config import ACCOUNT_TIMEOUT, FANOUT_CONCURRENCY
+
+
+async def call_account(call: Awaitable[Any], timeout: Optional[float] = ACCOUNT_TIMEOUT) -> Dict[str, Any]:
+    try:
+        return {"result": await asyncio.wait_for(call, timeout)}
+    except asyncio.TimeoutError:
+        return {"error": f"Timed out after {timeout}s"}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def run_bounded(
+        calls: Dict[int, Callable[[], Awaitable[Any]]],
+        timeout: Optional[float] = ACCOUNT_TIMEOUT,
+        limit: int = FANOUT_CONCURRENCY
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Run every call concurrently, at most `limit` at a time, and map each key to
+    either {"result": ...} or {"error": ...}. `timeout` applies per call.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(call: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        async with semaphore:
+            return await call_account(call(), timeout)
+
+    results = await asyncio.gather(*(bounded(call) for call in calls.values()))
+    return dict(zip(calls, results))
+
+
+async def fan_out(
+        exs: List[Exchange],
+        call: Callable[[Exchange], Awaitable[Any]],
+        timeout: float = ACCOUNT_TIMEOUT,
+        only_with_credentials: bool = False
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Run `call` against every account at once and map each 1-based account index
+    to either {"result": ...} or {"error": ...}.
+    """
+    return await run_bounded({
+        idx: (lambda ex=ex: call(ex)) for idx, ex in enumerate(exs, 1)
+        if not only_with_credentials or ex.apiKey is not None
+    }, timeout)
@@ -4,14 +4,14 @@ from typing import Any, Callable
 from fastapi import HTTPException, status
 from jose import JWTError
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 def handle_none_value(item_name='Item'):
     def decorator(func: Callable[..., Any]):
         @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
+        async def wrapper(*args, **kwargs):
+            result = await func(*args, **kwargs)
             if result is None:
                 raise HTTPException(status_code=404, detail=f"{item_name} Not found")
             return result
@@ -27,18 +27,17 @@ def handle_error(func: Callable[..., Any]):
     """
 
     @wraps(func)
-    def wrapper(*args, **kwargs):
+    async def wrapper(*args, **kwargs):
         db = args[0]
         # Check if the first argument is a database session
-        assert isinstance(db, Session), "First argument should be the database session"
-        # return func(*args, **kwargs)
+        assert isinstance(db, AsyncSession), "First argument should be the database session"
         try:
-            return func(*args, **kwargs)
+            return await func(*args, **kwargs)
         except IntegrityError as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
     return wrapper
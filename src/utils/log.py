@@ -0,0 +1,144 @@
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ulid import ULID
+
+from src.config import LOG_LEVEL, LOG_QUEUE_SIZE, LOG_SAMPLE_RATES
+from src.utils.metrics import LOG_RECORDS_DROPPED
+
+REQUEST_ID_HEADER = 'x-request-id'
+
+# set per HTTP request and inherited by every task the request spawns
+request_id: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
+
+# attributes every LogRecord has; anything else on a record came in through `extra`
+_RECORD_FIELDS = frozenset(logging.makeLogRecord({}).__dict__) | {'message', 'asctime', 'request_id'}
+
+access_logger = logging.getLogger('src.access')
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request id and any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        rid = getattr(record, 'request_id', None)
+        if rid is not None:
+            entry['request_id'] = rid
+        entry.update((key, value) for key, value in record.__dict__.items() if key not in _RECORD_FIELDS)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread as they are. The stock QueueHandler
+    formats the message on the calling thread; here that work, and the write,
+    happen on the listener thread, so callers must not mutate what they log.
+    The request id is read here because the listener thread cannot see it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # never block the event loop on a backed-up stdout
+            LOG_RECORDS_DROPPED.inc()
+
+
+def setup_logging(level: str = LOG_LEVEL, max_queue: int = LOG_QUEUE_SIZE) -> QueueListener:
+    """Route the root logger through a bounded queue to a JSON stdout writer on its own thread."""
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+    listener = QueueListener(queue.Queue(max_queue), output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in [handler for handler in root.handlers if isinstance(handler, AsyncQueueHandler)]:
+        root.removeHandler(handler)
+    root.addHandler(AsyncQueueHandler(listener.queue))
+    root.setLevel(level)
+    listener.start()
+    return listener
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """'/balance=0.1,/positions=0.1' -> {'/balance': 0.1, '/positions': 0.1}"""
+    rates = {}
+    for item in filter(None, (item.strip() for item in spec.split(','))):
+        path, rate = item.rsplit('=', 1)
+        rates[path.strip()] = float(rate)
+    return rates
+
+
+class RequestLogMiddleware:
+    """
+    Gives every HTTP request a correlation id, taken from the X-Request-ID
+    header or freshly generated, echoes it in the response and logs one
+    access line per request. Successful GETs of the paths in `sample_rates`
+    are only logged at that rate; errors are always logged.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rates: Optional[Dict[str, float]] = None):
+        self.app = app
+        self.sample_rates = parse_sample_rates(LOG_SAMPLE_RATES) if sample_rates is None else sample_rates
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        rid = next(
+            (value.decode('latin-1') for name, value in scope['headers'] if name == REQUEST_ID_HEADER.encode()),
+            None
+        )
+        # a caller-supplied id is kept short enough not to bloat every line
+        rid = rid[:64] if rid else str(ULID())
+        token = request_id.set(rid)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                message['headers'] = [
+                    *message.get('headers', []), (REQUEST_ID_HEADER.encode(), rid.encode('latin-1'))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            path = scope['path']
+            rate = self.sample_rates.get(path, 1.0) if scope['method'] == 'GET' and status_code < 400 else 1.0
+            if rate >= 1.0 or random.random() < rate:
+                access_logger.log(
+                    logging.INFO if status_code < 500 else logging.ERROR,
+                    "%s %s %d", scope['method'], path, status_code,
+                    extra={
+                        'method': scope['method'],
+                        'path': path,
+                        'status': status_code,
+                        'duration_ms': round((time.perf_counter() - start) * 1000, 2),
+                        'sample_rate': rate
+                    }
+                )
+            request_id.reset(token)
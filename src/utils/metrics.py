@@ -0,0 +1,154 @@
+import asyncio
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+WEBHOOK_STAGE_SECONDS = Histogram(
+    'webhook_stage_seconds',
+    'Time spent in each stage of the /oneway order path',
+    ['stage'],
+    buckets=LATENCY_BUCKETS
+)
+EXCHANGE_REQUEST_SECONDS = Histogram(
+    'exchange_request_seconds',
+    'Bybit REST round-trip time per account and endpoint',
+    ['account', 'endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+EXCHANGE_REQUEST_ERRORS = Counter(
+    'exchange_request_errors_total',
+    'Bybit REST requests that raised, per account and endpoint',
+    ['account', 'endpoint']
+)
+EXCHANGE_CONNECTIONS = Counter(
+    'exchange_connections_total',
+    'Bybit REST requests by endpoint and whether they opened a new connection or reused a pooled one',
+    ['endpoint', 'connection']
+)
+EXCHANGE_CLOCK_OFFSET_SECONDS = Gauge(
+    'exchange_clock_offset_seconds',
+    'Local clock minus Bybit server time, as last measured'
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_seconds',
+    'HTTP request latency per route',
+    ['method', 'route', 'status'],
+    buckets=LATENCY_BUCKETS
+)
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    'rate_limit_wait_seconds',
+    'Time a Bybit request waited for rate budget, per account and priority lane',
+    ['account', 'lane'],
+    buckets=LATENCY_BUCKETS
+)
+RATE_LIMIT_SHED = Counter(
+    'rate_limit_shed_total',
+    'Bybit reads refused client-side because the rate budget was exhausted',
+    ['account', 'endpoint']
+)
+RATE_LIMIT_COALESCED = Counter(
+    'rate_limit_coalesced_total',
+    'Bybit reads answered by an identical request already in flight',
+    ['account', 'endpoint']
+)
+
+JOURNAL_QUEUE_DEPTH = Gauge(
+    'journal_queue_depth',
+    'Trade journal rows waiting to be written'
+)
+JOURNAL_ROWS = Counter(
+    'journal_rows_total',
+    'Trade journal rows by outcome: written, dropped (queue full) or failed (insert error)',
+    ['outcome']
+)
+JOURNAL_FLUSH_SECONDS = Histogram(
+    'journal_flush_seconds',
+    'Time to bulk-insert one trade journal batch',
+    buckets=LATENCY_BUCKETS
+)
+
+READ_CACHE_REQUESTS = Counter(
+    'read_cache_requests_total',
+    'Account reads by cache outcome: hit, stale (served while refreshing), coalesced or miss',
+    ['endpoint', 'result']
+)
+
+STREAM_SUBSCRIBERS = Gauge(
+    'stream_subscribers',
+    'Clients connected to the position and balance stream'
+)
+STREAM_CONFLATED = Counter(
+    'stream_updates_conflated_total',
+    'Stream updates replaced by a newer one before a slow client read them'
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    'log_records_dropped_total',
+    'Log records dropped because the writer thread fell behind'
+)
+
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    'event_loop_lag_seconds',
+    'How late the event loop woke a periodic probe; time it spent blocked',
+    buckets=LATENCY_BUCKETS
+)
+
+EVENT_LOOP_PROBE_INTERVAL = 0.05
+
+
+@contextmanager
+def stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        WEBHOOK_STAGE_SECONDS.labels(name).observe(time.perf_counter() - start)
+
+
+def observe_stage(name: str, since: float):
+    WEBHOOK_STAGE_SECONDS.labels(name).observe(time.perf_counter() - since)
+
+
+async def monitor_event_loop(interval: float = EVENT_LOOP_PROBE_INTERVAL):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, time.perf_counter() - start - interval))
+
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request and labels it with the matched route template.
+    The arrival time is left in `scope['state']['received_at']` for handlers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        scope.setdefault('state', {})['received_at'] = start
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            HTTP_REQUEST_SECONDS.labels(
+                scope['method'],
+                route.path if route is not None else 'unmatched',
+                status_code
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,117 @@
+from typing import Dict, List, Optional
+
+from ccxt.base.errors import InvalidOrder
+from ccxt.async_support.base.exchange import Exchange
+
+
+def _decimals(step: str) -> int:
+    return len(step.rstrip('0').partition('.')[2])
+
+
+def _filter_float(value: Optional[str]) -> Optional[float]:
+    return float(value) if value else None
+
+
+class OrderSpec:
+    """
+    What it takes to size and send a market order for one swap or futures market,
+    resolved once when the catalogue loads instead of on every order.
+    Quantities are in contracts and rounded down to the quantity step, as
+    ccxt does; bodies are Bybit v5 /v5/order/create requests.
+    """
+
+    __slots__ = (
+        'symbol', 'market_id', 'category', 'contract_size', 'qty_step', 'qty_units', 'qty_scale', 'qty_decimals',
+        'min_qty', 'max_qty', 'max_market_qty', 'market'
+    )
+
+    def __init__(self, market: dict):
+        lot_size = market['info'].get('lotSizeFilter', {})
+        step = lot_size.get('qtyStep') or lot_size.get('basePrecision') or repr(market['precision']['amount'])
+        self.symbol: str = market['symbol']
+        self.market_id: str = market['id']
+        self.category: str = 'inverse' if market['inverse'] else 'linear'
+        self.contract_size: float = market['contractSize'] or 1.0
+        self.qty_step = float(step)
+        self.qty_decimals = _decimals(step)
+        # quantities are rounded as integers of 10^-qty_decimals, never as binary fractions
+        self.qty_scale = 10 ** self.qty_decimals
+        self.qty_units = round(self.qty_step * self.qty_scale)
+        self.min_qty: float = _filter_float(lot_size.get('minOrderQty')) or market['limits']['amount']['min'] or 0.0
+        self.max_qty: Optional[float] = _filter_float(lot_size.get('maxOrderQty')) or market['limits']['amount']['max']
+        self.max_market_qty: Optional[float] = _filter_float(lot_size.get('maxMktOrderQty')) or self.max_qty
+        # kept for parsing responses into ccxt orders
+        self.market = market
+
+    def contracts(self, size: float) -> float:
+        """Order size in contracts for a size in base units."""
+        return size / self.contract_size
+
+    def qty(self, contracts: float) -> str:
+        """Round down to the quantity step and format the way Bybit expects; raises InvalidOrder below the minimum."""
+        steps = contracts * self.qty_scale / self.qty_units
+        # a float a hair below a whole step, like 0.3 / 0.1, still counts as that step
+        units = int(steps * (1 + 1e-12) + 1e-9) * self.qty_units
+        if units <= 0 or units / self.qty_scale < self.min_qty:
+            raise InvalidOrder(f"{self.symbol} order quantity {contracts} is below the minimum {self.min_qty}")
+        if self.qty_decimals == 0:
+            return str(units)
+        text = f"{units / self.qty_scale:.{self.qty_decimals}f}".rstrip('0')
+        return text[:-1] if text.endswith('.') else text
+
+    def market_order(self, side: str, contracts: float, reduce_only: bool = False) -> dict:
+        """Body of a one-way mode market order; raises InvalidOrder outside the market order limits."""
+        if self.max_market_qty is not None and contracts > self.max_market_qty:
+            raise InvalidOrder(
+                f"{self.symbol} order quantity {contracts} is above the market order maximum {self.max_market_qty}"
+            )
+        body = {
+            'symbol': self.market_id,
+            'side': 'Buy' if side == 'buy' else 'Sell',
+            'orderType': 'Market',
+            'category': self.category,
+            'qty': self.qty(contracts),
+            'positionIdx': 0,
+        }
+        if reduce_only:
+            body['reduceOnly'] = True
+        return body
+
+
+class OrderSpecs(Dict[str, OrderSpec]):
+    """
+    Order specs of every active swap and futures market, by ccxt symbol.
+    Options are contracts too, but neither `linear` nor `inverse` and not
+    traded in one-way mode, so they get none.
+    """
+
+    def __init__(self, markets: dict):
+        super().__init__(
+            (symbol, OrderSpec(market)) for symbol, market in markets.items()
+            if market['active'] and (market['swap'] or market['future'])
+        )
+
+
+async def create_market_order(ex: Exchange, spec: OrderSpec, side: str, contracts: float,
+                              reduce_only: bool = False) -> dict:
+    response = await ex.privatePostV5OrderCreate(spec.market_order(side, contracts, reduce_only))
+    return ex.parse_order(response['result'], spec.market)
+
+
+async def create_market_orders(ex: Exchange, spec: OrderSpec, orders: List[dict]) -> List[dict]:
+    """
+    Send several market orders for one market in a single batch request.
+    Each of `orders` has `side`, `contracts` and optionally `reduce_only`.
+    """
+    requests = []
+    for order in orders:
+        body = spec.market_order(order['side'], order['contracts'], order.get('reduce_only', False))
+        del body['category']
+        requests.append(body)
+    response = await ex.privatePostV5OrderCreateBatch({'category': spec.category, 'request': requests})
+    results = response['result'].get('list', [])
+    # a rejected order comes back empty with its error code alongside
+    for result, code in zip(results, response.get('retExtInfo', {}).get('list', [])):
+        if int(code.get('code', 0)) != 0:
+            result.update(code)
+    return ex.parse_orders(results, spec.market)
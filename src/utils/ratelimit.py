@@ -0,0 +1,171 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from ccxt.base.errors import RateLimitExceeded
+
+from src.config import RATE_LIMIT_READ_RESERVE, RATE_LIMIT_MAX_READ_WAIT
+from src.utils.metrics import RATE_LIMIT_SHED, RATE_LIMIT_WAIT_SECONDS
+
+HIGH, LOW = 0, 1
+LANES = ('high', 'low')
+
+# Bybit's default per-UID limits in requests per second, by endpoint group; the
+# X-Bapi-Limit headers replace them with the account's real limits once seen
+DEFAULT_RATE_LIMITS = {
+    'v5/order': 10,
+    'v5/position': 10,
+    'v5/account': 10,
+    'v5/asset': 5,
+    'v5/user': 10,
+}
+PRIVATE_RATE_LIMIT = 10
+# public endpoints are limited per IP: 600 requests per 5 seconds
+PUBLIC_RATE_LIMIT = 120
+
+_lane: ContextVar[int] = ContextVar('rate_limit_lane', default=LOW)
+
+
+@contextmanager
+def high_priority():
+    """Requests made inside this block, e.g. the position read before an order, use the order lane."""
+    token = _lane.set(HIGH)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+class TokenBucket:
+    """
+    Token bucket with two lanes. High-lane callers wait only for tokens; low-lane
+    callers also leave `reserve` of the capacity untouched and step aside while
+    anything is waiting in the high lane. Callers within a lane are served FIFO.
+    """
+
+    def __init__(self, rate: float, reserve: float = RATE_LIMIT_READ_RESERVE):
+        self.rate = rate
+        self.capacity = rate
+        self.reserve = reserve
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.locks = (asyncio.Lock(), asyncio.Lock())
+        self.waiting = [0, 0]
+
+    def _refill(self):
+        now = time.monotonic()
+        # `updated` sits in the future while the exchange has told us to back off
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def _floor(self, lane: int) -> float:
+        return 1 if lane == HIGH else 1 + self.reserve * self.capacity
+
+    def expected_wait(self, lane: int) -> float:
+        self._refill()
+        ahead = self.waiting[lane] + (self.waiting[HIGH] if lane == LOW else 0)
+        deficit = ahead + self._floor(lane) - self.tokens
+        return max(0.0, deficit / self.rate, self.updated - time.monotonic())
+
+    async def acquire(self, lane: int):
+        self.waiting[lane] += 1
+        try:
+            async with self.locks[lane]:
+                while True:
+                    self._refill()
+                    if self.tokens >= self._floor(lane) and (lane == HIGH or not self.waiting[HIGH]):
+                        self.tokens -= 1
+                        return
+                    await asyncio.sleep(max(
+                        (self._floor(lane) - self.tokens) / self.rate,
+                        self.updated - time.monotonic(),
+                        0.001
+                    ))
+        finally:
+            self.waiting[lane] -= 1
+
+    def sync(self, limit: int, remaining: int, reset_at: Optional[float]):
+        """Adopt the limit and remaining budget Bybit reported for this endpoint."""
+        self._refill()
+        if limit > 0 and limit != self.capacity:
+            self.rate = self.capacity = limit
+        self.tokens = min(self.tokens, remaining)
+        if remaining <= 0 and reset_at is not None:
+            self.updated = max(self.updated, time.monotonic() + reset_at - time.time())
+
+
+class RateLimiter:
+    """
+    Client-side view of one account's Bybit budget: a token bucket per endpoint,
+    sized from DEFAULT_RATE_LIMITS until Bybit's limit headers say otherwise.
+    Order placement and cancellation always go through the high lane.
+    """
+
+    def __init__(self, account: str):
+        self.account = account
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, api: str, path: str) -> TokenBucket:
+        key = path if api == 'private' else 'public'
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if api == 'private':
+                rate = DEFAULT_RATE_LIMITS.get('/'.join(path.split('/')[:2]), PRIVATE_RATE_LIMIT)
+            else:
+                rate = PUBLIC_RATE_LIMIT
+            bucket = self.buckets[key] = TokenBucket(rate)
+        return bucket
+
+    @staticmethod
+    def lane(path: str, method: str) -> int:
+        if method == 'POST' and path.startswith('v5/order/'):
+            return HIGH
+        return _lane.get()
+
+    async def acquire(self, api: str, path: str, method: str):
+        bucket = self.bucket(api, path)
+        lane = self.lane(path, method)
+        # reads are safe to drop; writes queue however long it takes
+        if lane == LOW and method == 'GET' and bucket.expected_wait(LOW) > RATE_LIMIT_MAX_READ_WAIT:
+            RATE_LIMIT_SHED.labels(self.account, path).inc()
+            raise RateLimitExceeded(f"bybit account {self.account} is short of rate budget for {path}, read shed")
+        start = time.perf_counter()
+        await bucket.acquire(lane)
+        RATE_LIMIT_WAIT_SECONDS.labels(self.account, LANES[lane]).observe(time.perf_counter() - start)
+
+    def sync(self, path: str, headers: dict):
+        limit = remaining = reset_at = None
+        for name, value in headers.items():
+            name = name.lower()
+            if name == 'x-bapi-limit':
+                limit = value
+            elif name == 'x-bapi-limit-status':
+                remaining = value
+            elif name == 'x-bapi-limit-reset-timestamp':
+                reset_at = value
+        if limit is None or remaining is None:
+            return
+        try:
+            self.bucket('private', path).sync(
+                int(limit), int(remaining), int(reset_at) / 1000 if reset_at else None
+            )
+        except ValueError:
+            pass
+
+    def stats(self) -> Dict[str, dict]:
+        stats = {}
+        for key, bucket in self.buckets.items():
+            bucket._refill()
+            stats[key] = {
+                'limit': bucket.capacity,
+                'tokens': round(bucket.tokens, 2),
+                'waiting': dict(zip(LANES, bucket.waiting)),
+            }
+        return stats
+
+
+def rate_limit_stats(exs: List) -> Dict[int, dict]:
+    return {idx + 1: ex.limiter.stats() for idx, ex in enumerate(exs) if getattr(ex, 'limiter', None)}
@@ -0,0 +1,33 @@
+import asyncio
+
+from src.utils.coalesce import Coalescer
+
+
+def test_concurrent_callers_share_one_request_until_dropped():
+    async def scenario():
+        requests = Coalescer()
+        calls = 0
+        release = asyncio.Event()
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            number = calls
+            await release.wait()
+            return number
+
+        first = asyncio.ensure_future(requests.join('key', call))
+        shared = asyncio.ensure_future(requests.join('key', call))
+        await asyncio.sleep(0)
+        # one caller giving up does not cancel the request for the other
+        first.cancel()
+        requests.drop()
+        fresh = asyncio.ensure_future(requests.join('key', call))
+        await asyncio.sleep(0)
+        release.set()
+        assert await shared == 1
+        assert await fresh == 2
+        assert calls == 2
+        assert 'key' not in requests
+
+    asyncio.run(scenario())
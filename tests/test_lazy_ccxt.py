@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+# a fresh interpreter, since ccxt is imported in full once anything else imports it
+CHECK = """
+import sys
+import src.server
+from src.utils import lazy_ccxt
+assert 'ccxt.binance' not in sys.modules, 'ccxt was imported in full'
+missing = lazy_ccxt.unresolved()
+assert not missing, f'not resolved: {missing}'
+"""
+
+
+def test_app_import_leaves_ccxt_lazy_with_every_used_name_resolved():
+    subprocess.run([sys.executable, '-c', CHECK], check=True)
@@ -0,0 +1,40 @@
+import asyncio
+
+from src.services.positions import PositionStream
+
+
+class FakeExchange:
+    apiKey = None
+
+    def __init__(self):
+        self.position = {'symbol': 'BTC/USDT:USDT', 'contracts': 0}
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def fetch_position(self, symbol):
+        position = self.position
+        self.started.set()
+        await self.release.wait()
+        return position
+
+
+def test_rest_result_older_than_a_stream_update_is_not_kept():
+    async def scenario():
+        ex = FakeExchange()
+        stream = PositionStream([ex])
+        stream.start()
+        stream.live.add(ex)
+        symbol = 'BTC/USDT:USDT'
+
+        read = asyncio.ensure_future(stream.fetch_position(ex, symbol))
+        await ex.started.wait()
+        # a fill: the execution, then the position it left, arrive while the REST read is out
+        filled = {'symbol': symbol, 'contracts': 1}
+        stream.invalidate(ex, symbol)
+        stream._advance(ex, symbol)
+        stream._store(ex, symbol, filled)
+        ex.release.set()
+        assert (await read)['contracts'] == 0
+        assert stream.cached(ex, symbol) is filled
+
+    asyncio.run(scenario())
@@ -0,0 +1,33 @@
+import asyncio
+
+from src.services.reads import ReadCache
+
+
+def test_read_after_invalidate_does_not_share_an_earlier_request():
+    async def scenario():
+        cache = ReadCache(ttl=60, stale=0)
+        ex = object()
+        balance = 'before-order'
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def fetch():
+            value = balance
+            started.set()
+            await release.wait()
+            return value
+
+        before = asyncio.ensure_future(cache.get(ex, 'balance', None, fetch))
+        await started.wait()
+        # an order fills while the first read is out
+        balance = 'after-order'
+        cache.invalidate(ex)
+        after = asyncio.ensure_future(cache.get(ex, 'balance', None, fetch))
+        await asyncio.sleep(0)
+        release.set()
+        assert await before == 'before-order'
+        assert await after == 'after-order'
+        # the read that predates the order is not cached either
+        assert await cache.get(ex, 'balance', None, fetch) == 'after-order'
+
+    asyncio.run(scenario())